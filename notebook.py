@@ -13,7 +13,7 @@
 
 # ### 1.Import Library
 # 
-# Kode pada cell ini mengimpor pustaka-pustaka yang diperlukan untuk analisis data, pemrosesan teks, dan visualisasi. Pustaka tersebut mencakup `pandas`, `numpy` dan `scipy` untuk manipulasi data, `json` untuk pengolahan data JSON, `scikit-learn` untuk ekstraksi fitur teks dan penghitungan kesamaan, serta `matplotlib` untuk visualisasi data. Semua pustaka ini digunakan untuk mendukung proses analisis dan pengembangan sistem rekomendasi.
+# Kode pada cell ini mengimpor pustaka-pustaka yang diperlukan untuk analisis data, pemrosesan teks, dan visualisasi. Pustaka tersebut mencakup `pandas` dan `numpy` untuk manipulasi data, `json` untuk pengolahan data JSON, `matplotlib` untuk visualisasi data, serta modul lokal `recommender` untuk persiapan data, ekstraksi fitur teks (TF-IDF), dan penghitungan kesamaan antar film. Semua pustaka ini digunakan untuk mendukung proses analisis dan pengembangan sistem rekomendasi.
 
 # In[24]:
 
@@ -21,10 +21,30 @@
 import pandas as pd
 import numpy as np
 import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import MultiLabelBinarizer
-from sklearn.metrics.pairwise import cosine_similarity
-from scipy.sparse import hstack
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+from urllib.request import urlopen
+from recommender import (
+    FilterIndex,
+    IVFIndex,
+    NeighborIndex,
+    RecommendationService,
+    RecommenderModel,
+    ServiceThread,
+    SimilarityEngine,
+    StreamingFeatureBuilder,
+    TitleIndex,
+    build_embedding,
+    build_neighbor_index,
+    evaluate_ann,
+    evaluate_catalog,
+    select_top_n,
+)
+from recommender.ingest import CSV_COLUMNS, prepare_batch
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -33,13 +53,13 @@ import seaborn as sns
 
 # ### 2.1 Memuat Dataset
 # 
-# Kode berikut digunakan untuk memuat dataset TMDB Movie ke dalam sebuah DataFrame menggunakan pustaka `pandas`. Dataset ini disimpan dalam file CSV bernama `tmdb_5000_movies.csv`. Setelah dataset dimuat, lima baris pertama dari dataset ditampilkan menggunakan fungsi `head()`. Hal ini bertujuan untuk memahami struktur data, termasuk kolom-kolom yang tersedia dan beberapa nilai awalnya.
+# Kode berikut digunakan untuk memuat dataset TMDB Movie ke dalam sebuah DataFrame menggunakan pustaka `pandas`. Dataset ini disimpan dalam file CSV bernama `tmdb_5000_movies.csv` yang berisi 20 kolom. Hanya 7 kolom yang dipakai sistem rekomendasi (`CSV_COLUMNS`: `title`, `genres`, `keywords`, `overview`, `popularity`, `release_date`, `runtime`) yang dibaca (`usecols`), sehingga 13 kolom lainnya (`budget`, `homepage`, `tagline`, dan seterusnya) tidak pernah dimuat ke memori. CSV hanya dibaca satu kali; DataFrame ini juga menjadi sumber `movies_prep`. Setelah dataset dimuat, lima baris pertama ditampilkan menggunakan fungsi `head()` untuk memahami struktur data dan beberapa nilai awalnya.
 
 # In[2]:
 
 
 # Load the dataset
-movies = pd.read_csv('./tmdb_5000_movies.csv')
+movies = pd.read_csv('./tmdb_5000_movies.csv', usecols=CSV_COLUMNS)
 
 # Tampilkan 5 data teratas
 movies.head()
@@ -54,17 +74,16 @@ movies.head()
 # 
 # #### Insight dari Output
 # 1. **Informasi Dataset**:
-#     - Dataset memiliki **4803 baris** dan **20 kolom**.
-#     - Kolom memiliki berbagai tipe data, termasuk `int64`, `float64`, dan `object`.
-#     - Beberapa kolom memiliki nilai yang hilang, seperti `homepage` (3091 nilai hilang), `overview` (3 nilai hilang), `release_date` (1 nilai hilang), `runtime` (2 nilai hilang), dan `tagline` (844 nilai hilang).
+#     - Dataset memiliki **4803 baris**; dari 20 kolom CSV, 7 kolom yang dipakai sistem rekomendasi dimuat.
+#     - Kolom memiliki berbagai tipe data, termasuk `float64` dan `object`.
+#     - Beberapa kolom memiliki nilai yang hilang, yaitu `overview` (3 nilai hilang), `release_date` (1 nilai hilang), dan `runtime` (2 nilai hilang).
 #     - Tidak ada baris duplikat dalam dataset.
 # 
 # 2. **Kapasitas Memori**:
-#     - Dataset menggunakan **750.6 KB** memori.
+#     - Kolom yang tidak dipakai (misalnya `homepage` dan `tagline`, yang sebagian besar nilainya hilang) tidak ikut dimuat, sehingga memori hanya dipakai untuk data yang relevan.
 # 
 # 3. **Kualitas Data**:
-#     - Kolom seperti `homepage` dan `tagline` memiliki banyak nilai yang hilang, sehingga perlu dipertimbangkan apakah kolom ini relevan untuk analisis atau perlu dihapus.
-#     - Kolom lain seperti `overview`, `release_date`, dan `runtime` memiliki sedikit nilai yang hilang, sehingga dapat diisi (imputasi) atau dihapus barisnya.
+#     - Kolom `overview`, `release_date`, dan `runtime` memiliki sedikit nilai yang hilang, sehingga dapat diisi (imputasi): `overview` kosong menjadi string kosong, sedangkan `year` dan `runtime` yang tidak diketahui menjadi `NaN`.
 
 # In[3]:
 
@@ -90,17 +109,13 @@ print(movies.duplicated().sum())
 # Kode di atas digunakan untuk menganalisis distribusi genre film dalam dataset. Berikut adalah langkah-langkah yang dilakukan:
 # 
 # 1. **Ekstraksi Genre**:
-#     - Kolom `genres` yang berisi data dalam format JSON diubah menjadi daftar nama genre menggunakan fungsi `json.loads` dan `lambda`.
-#     - Hasilnya disimpan dalam kolom baru bernama `genres_list`.
+#     - `movies_prep = prepare_batch(movies)`: Kolom `genres` dan `keywords` yang berisi data dalam format JSON di-*parse* **tepat satu kali per baris** menjadi `genres_list` dan `keywords_list` (lihat bagian 3.1). Hasil yang sama dipakai untuk EDA dan untuk pembuatan fitur, sehingga JSON tidak di-*parse* ulang.
 # 
-# 2. **Menggabungkan Semua Genre**:
-#     - Semua genre dari setiap film digabungkan menjadi satu daftar menggunakan list comprehension, menghasilkan variabel `all_genres`.
-# 
-# 3. **Menghitung Frekuensi Genre**:
-#     - Frekuensi kemunculan setiap genre dihitung menggunakan `pd.Series` dan `value_counts()`.
+# 2. **Menghitung Frekuensi Genre**:
+#     - `movies_prep['genres_list'].explode()` meratakan daftar genre semua film, lalu frekuensi kemunculan setiap genre dihitung dengan `value_counts()`.
 #     - Hanya 10 genre teratas yang diambil untuk analisis lebih lanjut.
 # 
-# 4. **Visualisasi**:
+# 3. **Visualisasi**:
 #     - Data frekuensi genre divisualisasikan dalam bentuk diagram batang menggunakan `matplotlib`.
 #     - Diagram ini menunjukkan 10 genre teratas berdasarkan jumlah kemunculannya dalam dataset.
 # 
@@ -113,9 +128,8 @@ print(movies.duplicated().sum())
 
 # Exploratory Data Analysis (EDA)
 # Tampilkan distribusi Genre
-movies['genres_list'] = movies['genres'].apply(json.loads).apply(lambda x: [d['name'] for d in x])
-all_genres = [g for sub in movies['genres_list'] for g in sub]
-genre_counts = pd.Series(all_genres).value_counts().head(10)
+movies_prep = prepare_batch(movies)
+genre_counts = movies_prep['genres_list'].explode().value_counts().head(10)
 
 plt.figure(figsize=(8,5))
 genre_counts.plot(kind='bar')
@@ -130,25 +144,27 @@ plt.show()
 
 # ### 3.1 Ekstraksi dan Transformasi Data
 # 
-# Kode berikut digunakan untuk mempersiapkan data sebelum digunakan dalam analisis atau pengembangan model. Berikut adalah langkah-langkah yang dilakukan:
+# Dataset `movies_prep` sudah dibuat di bagian EDA dengan `prepare_batch` dari modul `recommender`, sehingga CSV tidak dibaca ulang dan JSON tidak di-*parse* ulang. Langkah-langkah yang dilakukan adalah sebagai berikut:
 # 
-# 1. **Salin Dataset**:
-#     - Dataset `movies` disalin ke dalam variabel baru bernama `movies_prep` menggunakan fungsi `copy()`. Hal ini dilakukan untuk menjaga dataset asli tetap utuh dan tidak terpengaruh oleh perubahan yang dilakukan pada dataset baru.
+# 1. **Membaca Kolom yang Diperlukan Saja**:
+#     - Hanya 7 kolom `CSV_COLUMNS` yang dibaca dari CSV (`usecols`), sehingga 13 kolom lain tidak pernah dimuat ke memori.
+#     - Untuk katalog yang jauh lebih besar dari 4803 film, fungsi yang sama dijalankan per potongan CSV oleh `iter_prepared_batches`/`build_model_from_csv`, sehingga memori tetap terbatas.
 # 
-# 2. **Ekstraksi Kolom `keywords`**:
-#     - Kolom `keywords` yang berisi data dalam format JSON diubah menjadi daftar kata kunci menggunakan fungsi `json.loads` dan `lambda`.
-#     - Setiap elemen JSON dalam kolom `keywords` diekstrak menjadi daftar nama kata kunci (`keywords_list`).
+# 2. **Ekstraksi Kolom `genres` dan `keywords`**:
+#     - Kolom `genres` dan `keywords` yang berisi data dalam format JSON di-*parse* **tepat satu kali per baris** (menggunakan `orjson` bila tersedia) menjadi daftar nama genre (`genres_list`) dan daftar kata kunci (`keywords_list`).
 # 
 # 3. **Penanganan Nilai Kosong pada Kolom `overview`**:
-#     - Nilai kosong (missing values) pada kolom `overview` diisi dengan string kosong (`''`) menggunakan fungsi `fillna()`. Hal ini memastikan bahwa kolom `overview` tidak memiliki nilai kosong yang dapat menyebabkan error saat digunakan.
+#     - Nilai kosong (missing values) pada kolom `overview` diisi dengan string kosong (`''`). Hal ini memastikan bahwa kolom `overview` tidak memiliki nilai kosong yang dapat menyebabkan error saat digunakan.
 # 
-# 4. **Seleksi Kolom Penting**:
-#     - Dataset disederhanakan dengan hanya menyimpan kolom-kolom yang relevan, yaitu:
+# 4. **Kolom Hasil**:
+#     - Dataset hanya berisi kolom-kolom yang relevan, yaitu:
 #       - `title`: Judul film.
 #       - `genres_list`: Daftar genre film.
 #       - `keywords_list`: Daftar kata kunci terkait film.
 #       - `overview`: Ringkasan cerita film.
 #       - `popularity`: Skor popularitas film.
+#       - `year`: Tahun rilis film dari kolom `release_date` (`NaN` jika kosong), dipakai untuk membedakan film berjudul sama.
+#       - `runtime`: Durasi film dalam menit, dipakai sebagai filter rekomendasi.
 # 
 # 5. **Output Dataset**:
 #     - Dataset hasil transformasi ditampilkan untuk memastikan bahwa proses persiapan data telah berhasil dilakukan.
@@ -159,38 +175,24 @@ plt.show()
 # In[6]:
 
 
-movies_prep = movies.copy()
-# ekstrak keywords sebagai list
-movies_prep['keywords_list'] = movies_prep['keywords'].apply(json.loads).apply(lambda x: [d['name'] for d in x])
-movies_prep['overview'] = movies_prep['overview'].fillna('')
-
-movies_prep = movies_prep[['title','genres_list','keywords_list','overview','popularity']]
 movies_prep
 
 
 # ### 3.2 Feature Engineering
 
-# Kode berikut digunakan untuk melakukan rekayasa fitur (feature engineering) pada dataset `movies_prep`. Langkah-langkah yang dilakukan adalah sebagai berikut:
+# Kode berikut digunakan untuk melakukan rekayasa fitur (feature engineering) pada dataset `movies_prep` secara inkremental dengan `StreamingFeatureBuilder`. Langkah-langkah yang dilakukan adalah sebagai berikut:
 # 
-# 1. **Binarisasi Genre**:
-#     - `MultiLabelBinarizer` digunakan untuk mengubah daftar genre dalam kolom `genres_list` menjadi representasi matriks biner.
-#     - Setiap genre direpresentasikan sebagai kolom, dengan nilai `1` jika film memiliki genre tersebut, dan `0` jika tidak.
-#     - Hasilnya disimpan dalam variabel `genre_mat`.
+# 1. **Hitungan Term per Potongan**:
+#     - `builder.partial_fit(batch)`: `movies_prep` dimasukkan per potongan 1000 baris. Untuk `overview` dan `keywords_list` (daftar kata kunci digabungkan menjadi string) hanya hitungan term setiap potongan yang disimpan dalam bentuk sparse, bukan teks mentahnya, sehingga katalog yang jauh lebih besar tetap dapat diproses dengan memori terbatas.
 # 
-# 2. **Ekstraksi Fitur dari Overview**:
-#     - `TfidfVectorizer` digunakan untuk mengubah teks dalam kolom `overview` menjadi representasi numerik berbasis TF-IDF (Term Frequency-Inverse Document Frequency).
-#     - Parameter `stop_words='english'` digunakan untuk menghapus kata-kata umum dalam bahasa Inggris, dan `max_features=5000` membatasi jumlah fitur maksimum menjadi 5000.
-#     - Hasilnya disimpan dalam variabel `over_mat`.
+# 2. **Binarisasi Genre**:
+#     - Daftar genre dalam kolom `genres_list` diubah menjadi representasi matriks biner (`MultiLabelBinarizer`): setiap genre menjadi kolom dengan nilai `1` jika film memiliki genre tersebut, dan `0` jika tidak.
 # 
-# 3. **Ekstraksi Fitur dari Keywords**:
-#     - `TfidfVectorizer` juga digunakan untuk memproses kolom `keywords_list`, yang berisi daftar kata kunci terkait film.
-#     - Daftar kata kunci digabungkan menjadi string menggunakan fungsi `lambda`, kemudian diubah menjadi representasi numerik berbasis TF-IDF.
-#     - Parameter `max_features=3000` membatasi jumlah fitur maksimum menjadi 3000.
-#     - Hasilnya disimpan dalam variabel `key_mat`.
+# 3. **TF-IDF Overview dan Keywords**:
+#     - `builder.finalize()`: Setelah semua potongan masuk, kosakata `overview` dipangkas ke **5000** term paling sering dan `keywords` ke **3000** term (stop words bahasa Inggris dihapus), lalu IDF dihitung dari *document frequency*. Hasilnya sama dengan `TfidfVectorizer(stop_words='english', max_features=...)` yang di-*fit* pada seluruh data sekaligus, kecuali term dengan frekuensi sama persis di batas `max_features` yang di sini dipilih secara alfabetis.
 # 
 # 4. **Penggabungan Semua Fitur**:
-#     - Matriks fitur dari genre (`genre_mat`), overview (`over_mat`), keywords (`key_mat`), dan popularitas (`movies_prep[['popularity']].values`) digabungkan menjadi satu matriks fitur menggunakan fungsi `hstack`.
-#     - Matriks hasil penggabungan ini disimpan dalam variabel `feature_mat` dan akan digunakan sebagai input untuk model rekomendasi.
+#     - Matriks genre, TF-IDF overview, TF-IDF keywords, dan kolom `popularity` digabungkan (dalam urutan tersebut) lalu setiap barisnya dinormalisasi L2. Hasilnya adalah `model` (`RecommenderModel`) yang menyimpan `feature_mat`, judul, genre, metadata, dan ketiga vectorizer hasil fit (`mlb`, `tfidf_over`, `tfidf_key`), sehingga fitur tidak perlu di-*fit* dua kali.
 # 
 # #### Output
 # Matriks fitur `feature_mat` yang dihasilkan adalah representasi numerik dari data film, mencakup informasi genre, overview, keywords, dan popularitas. Matriks ini siap digunakan untuk analisis lebih lanjut, seperti penghitungan kesamaan atau pembuatan model rekomendasi.
@@ -198,16 +200,15 @@ movies_prep
 # In[7]:
 
 
-mlb = MultiLabelBinarizer()
-genre_mat = mlb.fit_transform(movies_prep['genres_list'])
-
-tfidf_over = TfidfVectorizer(stop_words='english', max_features=5000)
-over_mat = tfidf_over.fit_transform(movies_prep['overview'])
-
-tfidf_key = TfidfVectorizer(stop_words='english', max_features=3000)
-key_mat = tfidf_key.fit_transform(movies_prep['keywords_list'].apply(lambda x:' '.join(x)))
+builder = StreamingFeatureBuilder(max_overview_features=5000, max_keyword_features=3000)
+for start in range(0, len(movies_prep), 1000):
+    builder.partial_fit(movies_prep.iloc[start:start + 1000])
+model = builder.finalize()
 
-feature_mat = hstack([genre_mat, over_mat, key_mat, movies_prep[['popularity']].values])
+feature_mat = model.engine.feature_mat
+mlb, tfidf_over, tfidf_key = (model.vectorizers[name] for name in ('genres', 'overview', 'keywords'))
+print(f"Ukuran feature_mat: {feature_mat.shape}")
+print(f"Genre: {len(mlb.classes_)}, term overview: {len(tfidf_over.vocabulary_)}, term keywords: {len(tfidf_key.vocabulary_)}")
 
 
 # ## 4. Modeling and Results  
@@ -217,25 +218,29 @@ feature_mat = hstack([genre_mat, over_mat, key_mat, movies_prep[['popularity']].
 # 
 # #### Langkah-langkah Implementasi
 # 
-# 1. **Menghitung Similarity Matrix**:
-#     - `cos_sim = cosine_similarity(feature_mat, feature_mat)`:
-#       Matriks kesamaan dihitung menggunakan *cosine similarity* antara semua pasangan film dalam dataset. Matriks ini berbentuk persegi dengan ukuran `n x n`, di mana `n` adalah jumlah film dalam dataset. Nilai dalam matriks menunjukkan tingkat kesamaan antara dua film.
+# 1. **Menyiapkan Similarity Engine**:
+#     - `engine = SimilarityEngine(feature_mat, assume_normalized=True)`:
+#       Baris `feature_mat` sudah dinormalisasi L2 dan disimpan sebagai matriks sparse CSR (tanpa salinan). Kita **tidak** lagi membentuk matriks kesamaan persegi `n x n` (untuk 4803 film saja ukurannya ±184 MB dalam float64), sehingga memori hanya bergantung pada jumlah elemen non-zero.
+#     - `engine.scores(idx)`:
+#       Menghitung *cosine similarity* film ke-`idx` terhadap semua film lain dengan satu perkalian sparse matrix-vector ketika dibutuhkan.
 # 
-# 2. **Membuat Indeks Film**:
-#     - `indices = pd.Series(movies_prep.index, index=movies_prep['title']).drop_duplicates()`:
-#       Sebuah *Series* dibuat untuk memetakan judul film ke indeksnya dalam dataset. Hal ini mempermudah pencarian indeks berdasarkan judul film.
+# 2. **Membuat Indeks Judul**:
+#     - `title_index = TitleIndex(movies_prep['title'], years=movies_prep['year'])`:
+#       Memetakan judul yang dinormalisasi (huruf kecil, tanpa aksen dan tanda baca) ke indeks film. Judul yang dipakai lebih dari satu film tidak lagi membuat pencarian gagal: tanpa tahun dipilih film pertama, sedangkan film lain dapat dipilih dengan kunci bertahun seperti `"Avatar (2009)"`. Judul yang salah ketik menghasilkan `KeyError` berisi saran judul terdekat.
 # 
 # 3. **Fungsi `get_recommendations`**:
 #     - Fungsi ini digunakan untuk mendapatkan rekomendasi film berdasarkan judul film yang diberikan.
 #     - **Parameter**:
 #       - `title`: Judul film yang digunakan sebagai referensi.
 #       - `top_n`: Jumlah rekomendasi film yang diinginkan (default: 10).
-#     - **Langkah-langkah**:
-#       - `idx = indices[title]`: Mendapatkan indeks film berdasarkan judulnya.
-#       - `sims = list(enumerate(cos_sim[idx]))`: Mengambil daftar kesamaan antara film referensi dan semua film lainnya.
-#       - `sims = sorted(sims, key=lambda x: x[1], reverse=True)[1:top_n+1]`: Mengurutkan daftar kesamaan secara menurun dan mengambil `top_n` film teratas (mengabaikan film itu sendiri).
-#       - `rec_idx = [i for i,_ in sims]`: Mendapatkan indeks film yang direkomendasikan.
-#       - `return movies_prep['title'].iloc[rec_idx]`: Mengembalikan judul film yang direkomendasikan.
+#       - `diversity`: Bobot keberagaman 0..1 (default: 0, tanpa re-ranking).
+#       - `mode` dan `n_probe`: Jalur pencarian (`'exact'`, `'approx'`, atau `'embedding'`) dan jumlah daftar IVF yang diperiksa, diteruskan apa adanya ke `model.recommend` (lihat bagian 4.6 dan 4.7).
+#     - **Langkah-langkah** (dijalankan oleh `model.recommend`, metode yang sama dengan layanan HTTP dan `python -m recommender query`, sehingga hasil notebook dan produksi tidak berbeda):
+#       - `idx = title_index.resolve(title)`: Mendapatkan indeks film berdasarkan judulnya.
+#       - `engine.scores(idx)`: Menghitung kesamaan antara film referensi dan semua film lainnya.
+#       - `rec_idx, _ = select_top_n(..., top_n, exclude=idx)`: Memilih `top_n` film dengan skor tertinggi menggunakan seleksi parsial NumPy (`np.partition`), lalu hanya mengurutkan pemenangnya. Film referensi dikecualikan berdasarkan indeksnya (bukan dengan mengasumsikan posisi pertama), dan skor yang sama diurutkan berdasarkan indeks sehingga hasilnya deterministik.
+#       - `diversity` di luar rentang 0..1 ditolak dengan `ValueError`. Jika `diversity > 0`, `MMR_POOL_FACTOR x top_n` (5 x `top_n`) kandidat teratas disusun ulang dengan `mmr_rerank` (*Maximal Marginal Relevance*): setiap langkah memilih film dengan skor `(1 - diversity) * relevansi - diversity * kemiripan maksimum ke film yang sudah terpilih`, sehingga film yang hampir identik satu sama lain tidak memenuhi daftar.
+#       - `movies_prep[['title', 'genres_list']].iloc[...]`: Indeks hasil `model.recommend` dipakai untuk mengembalikan judul dan genre film yang direkomendasikan sebagai DataFrame.
 # 
 # 4. **Contoh Penggunaan**:
 #     - `get_recommendations('Avatar', 10)`:
@@ -247,20 +252,17 @@ feature_mat = hstack([genre_mat, over_mat, key_mat, movies_prep[['popularity']].
 # In[20]:
 
 
-cos_sim = cosine_similarity(feature_mat, feature_mat)
-indices = pd.Series(movies_prep.index, index=movies_prep['title']).drop_duplicates()
+engine = SimilarityEngine(feature_mat, assume_normalized=True)
+title_index = TitleIndex(movies_prep['title'], years=movies_prep['year'])
 
-def get_recommendations(title, top_n=10):
-    idx = indices[title]
-    sims = list(enumerate(cos_sim[idx]))
-    sims = sorted(sims, key=lambda x: x[1], reverse=True)[1:top_n+1]
-    rec_idx = [i for i, _ in sims]
-    recommendations = movies_prep[['title', 'genres_list']].iloc[rec_idx].copy()
+def get_recommendations(title, top_n=10, diversity=0.0, mode='exact', n_probe=None):
+    recs = model.recommend(title, top_n, mode=mode, n_probe=n_probe, diversity=diversity)
+    recommendations = movies_prep[['title', 'genres_list']].iloc[[r['idx'] for r in recs]].copy()
 
     return recommendations
 
 # Tampilkan genre dari Avatar untuk perbandingan
-avatar_genres = movies_prep.loc[indices['Avatar'], 'genres_list']
+avatar_genres = movies_prep.loc[title_index.resolve('Avatar'), 'genres_list']
 
 # Contoh output
 print(f"Genre untuk 'Avatar': {avatar_genres}")
@@ -268,27 +270,460 @@ print("\nRekomendasi untuk 'Avatar':")
 print(get_recommendations('Avatar', 10))
 
 
+# ### 4.2 Indeks Tetangga Top-K
+
+# Sebagian besar permintaan rekomendasi berbentuk "film yang mirip dengan X". Agar tidak perlu menghitung dan mengurutkan ulang skor seluruh katalog pada setiap panggilan, kita membangun **indeks tetangga top-K** satu kali.
+# 
+# #### Penjelasan Kode
+# 1. **Membangun Indeks**:
+#     - `build_neighbor_index(engine.feature_mat, k=50, assume_normalized=True, n_jobs=-1)`:
+#       Skor kesamaan dihitung per blok baris (perkalian matriks sparse), lalu hanya **50 tetangga terbaik** beserta skornya yang disimpan untuk setiap film. Matriks `n x n` tidak pernah dibentuk.
+#     - `n_jobs=-1`: Blok-blok baris dibagi ke semua core CPU. Array CSR dibagikan ke proses worker melalui file `.npy` yang di-*memory-map* (bukan salinan hasil pickle), dan setiap worker menulis hasil top-K bloknya langsung ke array keluaran bersama.
+# 
+# 2. **Menyimpan dan Memuat Indeks**:
+#     - `neighbor_index.save('neighbors_k50.npz')`: Menyimpan graf tetangga dalam format sparse CSR (`.npz`).
+#     - `NeighborIndex.load('neighbors_k50.npz')`: Memuat kembali indeks di sisi serving tanpa perlu menghitung ulang similarity.
+# 
+# 3. **Lookup Rekomendasi**:
+#     - `neighbor_index.neighbors(idx, top_n)`: Mengembalikan indeks dan skor tetangga film dalam waktu O(K) karena hanya memotong satu baris CSR yang sudah terurut.
+# 
+# #### Output
+# Daftar 10 film termirip dengan "Avatar" yang dibaca langsung dari indeks tetangga, beserta skor kesamaannya.
+
+# In[ ]:
+
+
+neighbor_index = build_neighbor_index(engine.feature_mat, k=50, assume_normalized=True, n_jobs=-1)
+neighbor_index.save('neighbors_k50.npz')
+
+# sisi serving: muat indeks dan jawab lookup dalam O(K)
+neighbor_index = NeighborIndex.load('neighbors_k50.npz')
+nb_idx, nb_scores = neighbor_index.neighbors(title_index.resolve('Avatar'), 10)
+avatar_neighbors = movies_prep[['title', 'genres_list']].iloc[nb_idx].copy()
+avatar_neighbors['score'] = nb_scores
+print(avatar_neighbors)
+
+
+# ### 4.3 Rekomendasi Batch untuk Banyak Judul
+
+# Untuk kebutuhan seperti membuat daftar "film serupa" bagi seluruh katalog, memanggil `get_recommendations` satu per satu berarti ribuan ekstraksi baris dan ribuan DataFrame kecil. Fungsi `get_recommendations_batch` memproses banyak judul sekaligus dengan `RecommenderModel.recommend_batch` dari modul `recommender` (metode yang sama dipakai `recommender.pipeline.query` untuk banyak judul).
+# 
+# #### Penjelasan Kode
+# 1. **Pemetaan Judul**:
+#     - `model.recommend_batch(titles, top_n)`: Daftar judul diubah menjadi array indeks film.
+# 
+# 2. **Skor dan Top-N per Potongan**:
+#     - Jika model memiliki `neighbor_index` dengan K yang cukup, hasil dibaca langsung dari indeks tersebut. Selain itu `engine.top_n_batch` dipakai: untuk setiap potongan 256 judul, skor kesamaan dihitung dengan **satu perkalian sparse matrix-matrix**, lalu top-N dipilih secara vektorisasi (`np.argpartition`) untuk semua baris sekaligus. Judul query selalu dikecualikan.
+# 
+# 3. **Format Long**:
+#     - `recommend_batch` mengembalikan array `seed`, `rank`, `rec_idx`, dan `score`; fungsi ini menambahkan kolom `title` dan mengganti indeks `seed` dengan judulnya, sehingga hasilnya satu DataFrame dengan satu baris per pasangan judul query–rekomendasi.
+# 
+# #### Output
+# Potongan hasil rekomendasi batch serta perbandingan waktu eksekusi antara batch dan pemanggilan `get_recommendations` berulang.
+
+# In[ ]:
+
+
+def get_recommendations_batch(titles, top_n=10):
+    batch = pd.DataFrame(model.recommend_batch(titles, top_n))
+    titles_arr = movies_prep['title'].to_numpy()
+    batch['seed'] = titles_arr[batch['seed']]
+    batch.insert(3, 'title', titles_arr[batch['rec_idx']])
+    return batch
+
+sample_titles = movies_prep['title'].iloc[:500].tolist()
+
+start = time.perf_counter()
+for t in sample_titles:
+    get_recommendations(t, 10)
+loop_time = time.perf_counter() - start
+
+start = time.perf_counter()
+batch_recs = get_recommendations_batch(sample_titles, 10)
+batch_time = time.perf_counter() - start
+
+print(batch_recs.head(10))
+print(f"\nLoop get_recommendations : {loop_time:.2f} detik")
+print(f"get_recommendations_batch: {batch_time:.2f} detik ({loop_time / batch_time:.1f}x lebih cepat)")
+
+
+# ### 4.4 Menyimpan dan Memuat Model
+
+# Setiap proses yang melayani rekomendasi tidak perlu menjalankan ulang seluruh pipeline (membaca CSV, `json.loads`, fit `MultiLabelBinarizer` dan kedua `TfidfVectorizer`). Model cukup di-*fit* sekali, disimpan, lalu dimuat.
+# 
+# #### Penjelasan Kode
+# 1. **Membungkus Model**:
+#     - `model` dari bagian 3.2 sudah menggabungkan `feature_mat`, judul, genre, nilai `popularity` mentah, metadata, dan ketiga vectorizer hasil fit; `neighbor_index` ditambahkan sehingga semuanya menjadi satu objek.
+# 
+# 2. **Menyimpan Artefak**:
+#     - `model.save('model_artifacts')`: Menyimpan kosakata vectorizer (JSON + `idf_`), array CSR `feature_mat` yang sudah ternormalisasi, judul, genre, dan indeks tetangga ke satu direktori. Array numerik disimpan sebagai `.npy` **tanpa kompresi**. Setiap penyimpanan menulis versi baru (`model_artifacts/v-<id>/`) lalu mengganti file penunjuk `model_artifacts/CURRENT` secara atomik, sehingga proses lain yang sedang memuat atau memetakan versi lama tidak pernah melihat direktori yang kosong atau setengah jadi.
+# 
+# 3. **Memuat Artefak**:
+#     - `RecommenderModel.load('model_artifacts', mmap=True)`: Array dimuat dengan `np.load(mmap_mode='r')`, sehingga banyak proses worker dapat berbagi satu salinan di page cache dan model siap dalam hitungan milidetik. Vectorizer baru dibangun ulang ketika dibutuhkan untuk `transform`.
+# 
+# #### Output
+# Waktu muat model dan 5 rekomendasi untuk "Avatar" dari model yang dimuat.
+
+# In[ ]:
+
+
+model.neighbor_index = neighbor_index
+model.save('model_artifacts')
+
+start = time.perf_counter()
+loaded_model = RecommenderModel.load('model_artifacts', mmap=True)
+print(f"Model dimuat dalam {(time.perf_counter() - start) * 1000:.1f} ms")
+
+for rec in loaded_model.recommend('Avatar', 5):
+    print(f"{rec['score']:.3f}  {rec['title']}  {rec['genres']}")
+
+
+# ### 4.5 Pembaruan Katalog Inkremental
+
+# Judul baru masuk ke katalog setiap hari. Menambahkan satu film tidak perlu menjalankan ulang `fit_transform` pada `mlb`, `tfidf_over`, dan `tfidf_key`, membangun ulang `hstack`, maupun menghitung ulang similarity seluruh film.
+# 
+# #### Penjelasan Kode
+# 1. **Menambahkan Film**:
+#     - `model.add_movies(new_movies)`: Baris baru di-*transform* menggunakan kosakata yang sudah dibekukan lalu ditambahkan ke `feature_mat`. Film baru mendapat daftar tetangga lengkap, sedangkan pada film lama hanya daftar tetangga yang tergeser oleh film baru yang diperbarui.
+#     - Nilai kembalian bernilai `True` jika **vocabulary drift** (`model.drift`, kenaikan proporsi token film baru yang tidak ada di kosakata dibandingkan `model.oov_baseline`, yaitu proporsi token korpus fit yang terpangkas `max_features`) melewati ambang 20%. Penghitung drift ikut disimpan di `meta.json`, sehingga tidak kembali ke nol setelah model dimuat ulang. Pada kondisi ini model sebaiknya dibangun ulang penuh dengan `model.refit('tmdb_5000_movies.csv')`, yang mem-*fit* ulang CSV asli ditambah film yang ditambahkan lewat `add_movies` (film yang dihapus tetap dilewati). Memanggil `build_model_from_csv` saja akan kehilangan film tambahan tersebut.
+# 
+# 2. **Menghapus Film**:
+#     - `model.remove_movies([...])`: Menghapus film berdasarkan judul atau indeks. Hanya film yang kehilangan tetangga yang dihitung ulang daftar tetangganya.
+# 
+# #### Output
+# Nilai drift setelah penambahan, rekomendasi untuk film baru, dan jumlah film di katalog setelah film tersebut dihapus kembali.
+
+# In[ ]:
+
+
+new_movies = pd.DataFrame({
+    'title': ['Avatar: The Way of Water'],
+    'genres_list': [['Science Fiction', 'Adventure', 'Action']],
+    'keywords_list': [['alien planet', 'ocean', 'family', 'sequel']],
+    'overview': ['Jake Sully lives with his newfound family formed on the extrasolar moon Pandora. '
+                 'Once a familiar threat returns to finish what was previously started, '
+                 'Jake must work with Neytiri and the army of the Na\'vi race to protect their home.'],
+    'popularity': [150.0],
+    'year': [2022],
+    'runtime': [192.0],
+})
+
+needs_refit = model.add_movies(new_movies)
+print(f"Jumlah film: {model.n_items}, drift: {model.drift:.2%}, perlu fit ulang: {needs_refit}")
+for rec in model.recommend('Avatar: The Way of Water', 5):
+    print(f"{rec['score']:.3f}  {rec['title']}  {rec['genres']}")
+
+model.remove_movies(['Avatar: The Way of Water'])
+print(f"\nJumlah film setelah dihapus: {model.n_items}")
+
+
+# ### 4.6 Approximate Nearest Neighbour (ANN)
+
+# Similarity eksak terhadap `feature_mat` yang lebarnya ribuan kolom masih cepat untuk 4803 film, tetapi biayanya tumbuh linear per query seiring bertambahnya katalog. Untuk katalog berukuran jutaan judul disediakan indeks ANN opsional berbasis **IVF (inverted file)** yang berjalan di dalam proses tanpa layanan eksternal.
+# 
+# #### Penjelasan Kode
+# 1. **Membangun Indeks**:
+#     - `IVFIndex.build(model.engine.feature_mat)`: Vektor fitur ternormalisasi dikelompokkan dengan *spherical k-means* menjadi ±√n daftar (*lists*).
+# 
+# 2. **Query Approximate**:
+#     - `model.recommend(title, top_n, mode='approx')`: Hanya `n_probe` daftar dengan centroid termirip yang diperiksa, kemudian kandidatnya diberi skor cosine eksak. `mode='exact'` (default) tetap memakai jalur eksak. Opsi yang sama tersedia di `get_recommendations(..., mode='approx', n_probe=...)`.
+#     - Untuk setiap daftar, baris `feature_mat` disusun ulang sehingga kandidat satu daftar berada dalam satu rentang memori. Salinan terurut ini ikut disimpan oleh `model.save` (`ann_order.npy`, `ann_rows_*.npy`) dan di-*memory-map* saat dimuat, sehingga setiap proses worker tidak membuat salinan pribadinya sendiri.
+# 
+# 3. **Mengukur Trade-off**:
+#     - `evaluate_ann(model, n_probe=...)`: Mengukur **recall@10** jalur approximate terhadap jalur eksak beserta latensi rata-rata keduanya, sehingga nilai `n_probe` dapat dipilih sesuai kebutuhan kecepatan dan kualitas.
+# 
+# #### Output
+# Tabel recall@10 dan latensi untuk beberapa nilai `n_probe`, serta rekomendasi approximate untuk "Avatar". Pada katalog sekecil 4803 film jalur eksak masih sama cepatnya; keuntungan IVF baru terasa pada katalog ratusan ribu judul ke atas karena jumlah kandidat tumbuh kira-kira sebanding √n.
+
+# In[ ]:
+
+
+model.ann_index = IVFIndex.build(model.engine.feature_mat)
+print(f"Jumlah daftar IVF: {model.ann_index.n_lists}")
+
+ann_report = pd.DataFrame([
+    {'n_probe': n_probe, **evaluate_ann(model, n_queries=200, top_n=10, n_probe=n_probe)}
+    for n_probe in (1, 4, 8, 16)
+])
+print(ann_report.round(3))
+
+print("\nRekomendasi approximate untuk 'Avatar':")
+print(get_recommendations('Avatar', 5, mode='approx', n_probe=8))
+
+
+# ### 4.7 Mode Embedding Dense (TruncatedSVD + float32)
+
+# `feature_mat` memiliki ribuan kolom dengan skala yang sangat berbeda: one-hot genre bernilai 0/1, TF-IDF bernilai kecil, sedangkan kolom `popularity` mentah bisa bernilai ratusan sehingga mendominasi cosine similarity. Mode embedding opsional menyeimbangkan setiap blok fitur lalu memadatkannya menjadi vektor dense berukuran kecil.
+# 
+# #### Penjelasan Kode
+# 1. **Membangun Embedding**:
+#     - `build_embedding(model, n_components=128)`: Setiap blok fitur (genre, overview, keywords) dinormalisasi L2 secara terpisah, `popularity` diubah ke skala `log1p` 0..1 dengan bobot 0.25, kemudian semuanya diproyeksikan dengan `TruncatedSVD` menjadi 128 dimensi `float32` yang ber-norma L2.
+# 
+# 2. **Memori dan Latensi**:
+#     - Embedding disimpan sebagai satu array n x 128 yang kontigu, sehingga skor similarity satu film terhadap seluruh katalog cukup dihitung dengan satu perkalian matriks-vektor BLAS.
+#     - Ukurannya dibandingkan dengan `feature_mat` sparse dan dengan `feature_mat` dalam bentuk dense float64.
+# 
+# 3. **Rekomendasi**:
+#     - `model.recommend(title, top_n, mode='embedding')`: Memakai embedding dense. Film yang ditambahkan atau dihapus lewat `add_movies`/`remove_movies` ikut diproyeksikan tanpa melatih ulang SVD, dan embedding ikut tersimpan pada `model.save`.
+# 
+# #### Output
+# Perbandingan memori, latensi rata-rata per query, serta rekomendasi mode embedding untuk "Avatar".
+
+# In[ ]:
+
+
+model.embedding = build_embedding(model, n_components=128)
+embedding = model.embedding
+
+sparse_bytes = sum(getattr(model.engine.feature_mat, part).nbytes for part in ('data', 'indices', 'indptr'))
+dense_bytes = model.n_items * model.engine.feature_mat.shape[1] * 8
+print(f"feature_mat sparse      : {sparse_bytes / 1e6:.1f} MB")
+print(f"feature_mat dense (f64) : {dense_bytes / 1e6:.1f} MB")
+print(f"embedding {embedding.embeddings.shape} float32: {embedding.embeddings.nbytes / 1e6:.1f} MB")
+
+queries = np.random.default_rng(0).choice(model.n_items, 200, replace=False)
+for name, scorer in (('sparse', model.engine), ('embedding', embedding)):
+    start = time.perf_counter()
+    for i in queries:
+        select_top_n(scorer.scores(i), 10, exclude=i)
+    print(f"Latensi {name:9s}: {(time.perf_counter() - start) / len(queries) * 1000:.3f} ms/query")
+
+print("\nRekomendasi embedding untuk 'Avatar':")
+for rec in model.recommend('Avatar', 5, mode='embedding'):
+    print(f"{rec['score']:.3f}  {rec['title']}  {rec['genres']}")
+
+
+# ### 4.8 Pencarian Judul (Exact, Prefix, dan Fuzzy)
+
+# Kotak pencarian dan sistem rekomendasi memakai indeks judul yang sama (`model.title_index`), sehingga judul yang dipilih pengguna dari saran autocomplete selalu bisa langsung dipakai sebagai query rekomendasi.
+# 
+# #### Penjelasan Kode
+# 1. **Judul Duplikat**:
+#     - `title_index.lookup(title)`: Mengembalikan semua indeks film dengan judul tersebut. `title_index.label(idx)` menampilkan judul beserta tahunnya, dan label ini dapat dipakai kembali sebagai kunci yang unik.
+# 
+# 2. **Prefix dan Fuzzy**:
+#     - `model.search_titles(query, mode='prefix')`: Pencarian biner atas daftar judul ternormalisasi yang terurut, cocok untuk autocomplete saat pengguna mengetik.
+#     - `model.search_titles(query, mode='fuzzy')`: Inverted index trigram karakter dengan skor Dice, sehingga salah ketik seperti "Avtar" tetap menemukan "Avatar".
+#     - `mode='complete'` (default) mengisi hasil prefix dengan hasil fuzzy.
+# 
+# #### Output
+# Film berjudul duplikat beserta labelnya, hasil pencarian prefix dan fuzzy, serta latensi rata-rata setiap jenis lookup.
+
+# In[ ]:
+
+
+duplicate_title = movies_prep.loc[movies_prep['title'].duplicated(), 'title'].iloc[0]
+print(f"Film berjudul '{duplicate_title}':")
+for i in title_index.lookup(duplicate_title):
+    label = title_index.label(i)
+    print(f"  {i:5d}  {label}  ->  resolve: {title_index.resolve(label)}")
+
+print("\nPrefix 'av':", [r['label'] for r in model.search_titles('av', 5, mode='prefix')])
+print("Fuzzy 'Avtar':", [r['label'] for r in model.search_titles('Avtar', 5, mode='fuzzy')])
+
+for name, lookup in (('exact', title_index.resolve), ('prefix', title_index.prefix), ('fuzzy', title_index.fuzzy)):
+    query = 'Avtar' if name == 'fuzzy' else 'Avatar'
+    start = time.perf_counter()
+    for _ in range(1000):
+        lookup(query)
+    print(f"Latensi {name:6s}: {(time.perf_counter() - start):.3f} ms/query")
+
+
+# ### 4.9 Rekomendasi dengan Filter Genre dan Metadata
+
+# Permintaan seperti "mirip Avatar, tetapi hanya Animation" atau "rilis setelah 2010" tidak bisa dipenuhi dengan memfilter 10 hasil `get_recommendations`, karena hasilnya sering kosong. Filter diterapkan **sebelum** penilaian skor.
+# 
+# #### Penjelasan Kode
+# 1. **Indeks Bitmap**:
+#     - `FilterIndex(mlb.transform(...), mlb.classes_, numeric=...)`: Setiap kolom matriks genre disimpan sebagai bitmap (1 bit per film), sedangkan kolom numerik (`year`, `runtime`) disimpan terurut sehingga rentang nilai dicari dengan `searchsorted`. Model membangun indeks yang sama secara otomatis (`model.filter_index`).
+#     - `filter_index.candidates(filters)`: Menggabungkan bitmap dengan operasi bitwise dan mengembalikan indeks film kandidat.
+# 
+# 2. **Skor Hanya untuk Kandidat**:
+#     - `model.recommend(title, top_n, filters=...)`: Skor cosine dan seleksi top-N hanya dihitung untuk film kandidat, sehingga filter yang ketat membuat query lebih murah dan hasilnya tetap berisi `top_n` film (selama kandidatnya cukup).
+#     - Format filter: `genres` (wajib memiliki semua genre), `any_genres` (minimal satu), `exclude_genres`, serta rentang inklusif `(min, max)` untuk kolom numerik, dengan `None` sebagai batas terbuka.
+# 
+# #### Output
+# Jumlah kandidat untuk beberapa filter, rekomendasi "Avatar" yang hanya berisi film Animation rilis setelah 2010, dan latensi query dengan filter dibandingkan skor on-demand tanpa filter.
+
+# In[ ]:
+
+
+filter_index = FilterIndex(
+    mlb.transform(movies_prep['genres_list']),
+    mlb.classes_,
+    numeric={'year': movies_prep['year'], 'runtime': movies_prep['runtime']},
+)
+animation_after_2010 = {'genres': ['Animation'], 'year': (2011, None)}
+for filters in (animation_after_2010, {'any_genres': ['Horror', 'Thriller'], 'runtime': (None, 100)}):
+    print(f"{filters}: {filter_index.candidates(filters).size} kandidat")
+
+print("\nRekomendasi 'Avatar' (Animation, rilis setelah 2010):")
+for rec in model.recommend('Avatar', 5, filters=animation_after_2010):
+    year = int(model.metadata['year'][rec['idx']])
+    print(f"{rec['score']:.3f}  {rec['title']} ({year})  {rec['genres']}")
+
+start = time.perf_counter()
+for i in queries:
+    select_top_n(model.engine.scores(i), 10, exclude=i)
+print(f"\nLatensi tanpa filter (on-demand): {(time.perf_counter() - start) / len(queries) * 1000:.3f} ms/query")
+for filters in ({'genres': ['Drama']}, animation_after_2010):
+    start = time.perf_counter()
+    for i in queries:
+        model.recommend(model.titles[i], 10, filters=filters)
+    print(f"Latensi filter {filters}: {(time.perf_counter() - start) / len(queries) * 1000:.3f} ms/query")
+
+
+# ### 4.10 Rekomendasi untuk Profil Pengguna (Beberapa Film Favorit)
+
+# Pendekatan solusi menyebutkan rekomendasi untuk **list film favorit**, sedangkan `get_recommendations` hanya menerima satu judul. Menggabungkan daftar hasil per judul membuat latensi tumbuh linear terhadap panjang profil. Sebagai gantinya, seluruh profil diringkas menjadi **satu vektor query**.
+# 
+# #### Penjelasan Kode
+# 1. **Vektor Profil**:
+#     - `model.recommend_profile(liked, top_n, weights=..., disliked=..., dislike_weight=...)`: Baris `feature_mat` ternormalisasi dari film yang disukai dijumlahkan sesuai bobotnya (default 1), film yang tidak disukai dikurangkan dengan bobot `dislike_weight`, lalu hasilnya dinormalisasi L2.
+# 
+# 2. **Satu Perkalian untuk Seluruh Katalog**:
+#     - Katalog diberi skor terhadap vektor profil dengan satu perkalian sparse matrix-vector (atau dense pada `mode='embedding'`), dan semua film seed dikecualikan dari hasil. Parameter `filters` dari bagian 4.9 juga dapat dipakai.
+# 
+# #### Output
+# Rekomendasi untuk profil berisi "Avatar" (bobot 2) dan dua film lain dengan satu film yang tidak disukai, serta latensi untuk profil berukuran 1 sampai 1000 film yang tetap hampir datar.
+
+# In[ ]:
+
+
+profile = {'Avatar': 2.0, model.titles[10]: 1.0, model.titles[20]: 1.0}
+for rec in model.recommend_profile(list(profile), 5, weights=list(profile.values()), disliked=[model.titles[30]],
+                                   dislike_weight=0.5):
+    print(f"{rec['score']:.3f}  {rec['title']}  {rec['genres']}")
+
+print()
+for size in (1, 10, 100, 1000):
+    liked = model.titles[:size]
+    start = time.perf_counter()
+    for _ in range(20):
+        model.recommend_profile(liked, 10)
+    print(f"Profil {size:4d} film: {(time.perf_counter() - start) / 20 * 1000:.3f} ms/query")
+
+
+# ### 4.11 Layanan Rekomendasi HTTP dengan Cache LRU
+
+# Membungkus `get_recommendations` langsung di web handler berarti setiap request menghitung ulang skor dan membangun DataFrame pandas baru. Modul `recommender.service` menyediakan layanan HTTP/JSON berbasis `asyncio` yang memuat model satu kali.
+# 
+# #### Penjelasan Kode
+# 1. **Layanan dan Cache**:
+#     - `RecommendationService(model, cache_size=1024)`: Hasil rekomendasi disimpan dalam cache LRU berukuran terbatas dengan kunci `(film, top_n, mode, filters)`. Judul diubah ke indeks film terlebih dahulu, sehingga "Avatar" dan "avatar" memakai entri cache yang sama. Respons berupa list dict biasa yang langsung dikodekan ke JSON.
+#     - Endpoint: `/recommend`, `/profile`, `/search`, `/stats` (jumlah *hit*/*miss* cache), dan `/health`.
+#     - Cache hit dijawab langsung di event loop `asyncio`, sedangkan request yang harus menghitung skor dijalankan di thread pool (`run_in_executor`), sehingga satu query mahal tidak menahan koneksi lain. `service.warm()` menyiapkan `TitleIndex` (dimuat dari artefak) dan `FilterIndex` di awal (dilakukan otomatis oleh `RecommendationService.from_artifacts`), bukan pada request pertama.
+# 
+# 2. **Instance Lokal**:
+#     - `ServiceThread(service)`: Menjalankan server di thread latar pada port bebas, sehingga layanan dapat diuji langsung dari notebook. Di produksi layanan dijalankan dengan `python -m recommender.service model_artifacts --port 8000`.
+# 
+# #### Output
+# Respons JSON `/recommend`, latensi request pertama (*miss*) dibandingkan request berikutnya (*hit*), dan statistik cache.
+
+# In[ ]:
+
+
+service = RecommendationService(model, cache_size=1024)
+service.warm()
+server = ServiceThread(service)
+
+def call(path):
+    with urlopen(server.url + path) as response:
+        return json.loads(response.read())
+
+print(call('/recommend?title=Avatar&top_n=3'))
+filters = quote(json.dumps({'genres': ['Animation']}))
+print(call(f'/recommend?title=avatar&top_n=3&filters={filters}'))
+
+for label in ('miss', 'hit'):
+    start = time.perf_counter()
+    call(f'/recommend?title={quote(model.titles[42])}&top_n=10')
+    print(f"Request {label}: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+print(call('/stats'))
+server.stop()
+
+
+# ### 4.12 Benchmark pada Katalog Sintetis
+
+# Dataset TMDB hanya berisi sekitar 5.000 film, sehingga biaya pipeline pada katalog yang jauh lebih besar tidak terlihat. Modul `recommender.benchmark` membangkitkan katalog sintetis berformat TMDB dan mengukur setiap tahap pipeline secara terpisah.
+# 
+# #### Penjelasan Kode
+# 1. **Katalog Sintetis**:
+#     - `generate_catalog(n_items, path)`: Menulis CSV dengan kolom yang sama dengan `tmdb_5000_movies.csv`. Kolom `genres` dan `keywords` berupa JSON bergaya TMDB, `overview` memakai distribusi kata Zipf (sekitar 2% kosong), `popularity` berdistribusi log-normal, serta ada `release_date` dan `runtime`. CSV ditulis per *chunk* sehingga katalog 500.000 film tidak perlu dimuat utuh di memori saat dibangkitkan.
+# 
+# 2. **Pengukuran per Tahap**:
+#     - `run_benchmark(path)`: Mengukur waktu tahap-tahap yang sama dengan notebook dan `build_artifacts`: baca CSV, parse JSON (`prepare_batch`), `StreamingFeatureBuilder`, pembuatan `TitleIndex`, `build_neighbor_index` (dilewati untuk katalog di atas 100.000 film karena biayanya kuadratik), serta latensi query p50/p99. Latensi query mencakup pemetaan judul (`TitleIndex.resolve`), skor, `select_top_n`, dan pembentukan baris hasil. Peak RSS proses dicatat setelah setiap tahap (di Windows melalui `psutil` bila terpasang, selain itu kosong).
+#     - Modul benchmark baru diimpor di cell ini sehingga cell-cell sebelumnya tidak bergantung padanya.
+#     - Di notebook benchmark dijalankan di proses yang sama, sehingga peak RSS juga mencakup memori notebook. Untuk angka yang bersih, setiap ukuran dijalankan di proses terpisah melalui `python -m recommender.benchmark --sizes 5000 50000 500000 --output bench.json`.
+# 
+# #### Output
+# Tabel waktu per tahap (detik), latensi query (ms), dan peak RSS (MB) untuk setiap ukuran katalog.
+
+# In[ ]:
+
+
+from recommender.benchmark import generate_catalog, run_benchmark
+
+with tempfile.TemporaryDirectory() as bench_dir:
+    bench_results = [
+        run_benchmark(generate_catalog(n, os.path.join(bench_dir, f'tmdb_synthetic_{n}.csv')), n_queries=100)
+        for n in (5000, 20000)
+    ]
+bench_table = pd.DataFrame(bench_results).set_index('n_items')
+print(bench_table[[c for c in bench_table.columns if not c.startswith('rss_')]].round(3).T.to_string())
+
+
+# ### 4.13 Paket Headless untuk Worker
+
+# Notebook ini menjalankan EDA dan plot (`matplotlib`, `seaborn`) di level modul, sehingga tidak cocok diimpor oleh proses worker. Semua komponen yang dibutuhkan untuk menjawab query sudah berada di paket `recommender`, dengan titik masuk terpisah untuk build, load, dan query.
+# 
+# #### Penjelasan Kode
+# 1. **Titik Masuk**:
+#     - `build_artifacts(csv_path, path, neighbors=50, ann=False, embedding=0)` atau `python -m recommender build`: Membangun model dari CSV secara streaming, lengkap dengan indeks opsional, lalu menyimpan artefaknya.
+#     - `load_model(path)` dan `query(model, titles, top_n)` atau `python -m recommender query`: Memuat artefak (array di-*memory-map*) dan menjawab query tanpa pandas, scikit-learn, maupun pustaka visualisasi.
+# 
+# 2. **Import Lazy**:
+#     - Submodul `recommender` baru diimpor ketika atributnya pertama kali diakses, dan scikit-learn hanya diimpor saat vectorizer benar-benar dibutuhkan. Worker query pun cepat dimulai dan hemat memori.
+#     - Kode di bawah menjalankan worker di proses Python baru, lalu memeriksa pustaka berat mana yang ikut termuat.
+# 
+# #### Output
+# Waktu load + query di proses baru, daftar pustaka berat yang termuat (seharusnya kosong), dan hasil `python -m recommender query`.
+
+# In[ ]:
+
+
+worker = (
+    "import sys, time; start = time.perf_counter(); "
+    "from recommender import load_model, query; "
+    "query(load_model('model_artifacts'), 'Avatar', 10); "
+    "print(f'{time.perf_counter() - start:.3f} detik', "
+    "[m for m in ('pandas', 'sklearn', 'matplotlib', 'seaborn') if m in sys.modules])"
+)
+print(subprocess.run([sys.executable, '-c', worker], capture_output=True, text=True, check=True).stdout)
+cli = [sys.executable, '-m', 'recommender', 'query', 'model_artifacts', 'Avatar', '--top-n', '5']
+print(subprocess.run(cli, capture_output=True, text=True, check=True).stdout)
+
+
 # ## 5. Evaluation
 
 # ### Menghitung Skor Similarity untuk Film "Avatar"
 # 
-# Kode berikut digunakan untuk menghitung skor kesamaan (*similarity scores*) antara film **Avatar** dengan film lainnya dalam dataset. Skor kesamaan dihitung menggunakan matriks kesamaan (*cosine similarity matrix*) yang telah dibuat sebelumnya.
+# Kode berikut digunakan untuk menghitung skor kesamaan (*similarity scores*) antara film **Avatar** dengan film lainnya dalam dataset. Skor kesamaan dihitung menggunakan `engine` (*cosine similarity* on-demand) yang telah dibuat sebelumnya.
 # 
 # #### Penjelasan Kode
 # 1. **Mengambil Indeks Film "Avatar"**:
-#     - `avatar_idx = indices['Avatar']`:
-#       Mendapatkan indeks film "Avatar" dari *Series* `indices` yang memetakan judul film ke indeksnya dalam dataset.
+#     - `avatar_idx = title_index.resolve('Avatar')`:
+#       Mendapatkan indeks film "Avatar" dari `title_index` yang memetakan judul film ke indeksnya dalam dataset.
 # 
 # 2. **Menghitung Skor Kesamaan**:
-#     - `sim_scores = list(enumerate(cos_sim[avatar_idx]))`:
-#       Mengambil skor kesamaan antara film "Avatar" dan semua film lainnya dari matriks kesamaan `cos_sim`.
-#     - `sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:11]`:
-#       Mengurutkan skor kesamaan secara menurun dan mengambil 10 film teratas yang paling mirip dengan "Avatar" (mengabaikan film itu sendiri).
-# 
-# 3. **Ekstraksi Skor dan Judul Film**:
-#     - `similarity_scores = [score for idx, score in sim_scores]`:
-#       Menyimpan skor kesamaan dari 10 film teratas ke dalam daftar `similarity_scores`.
-#     - `movie_titles = movies_prep['title'].iloc[[idx for idx, score in sim_scores]].values`:
+#     - `engine.scores(avatar_idx)`:
+#       Menghitung skor kesamaan antara film "Avatar" dan semua film lainnya menggunakan `engine`.
+#     - `rec_idx, similarity_scores = select_top_n(..., 10, exclude=avatar_idx)`:
+#       Memilih 10 film teratas yang paling mirip dengan "Avatar" (mengecualikan film itu sendiri) beserta skor kesamaannya, tanpa mengurutkan seluruh katalog.
+# 
+# 3. **Ekstraksi Judul Film**:
+#     - `movie_titles = movies_prep['title'].iloc[rec_idx].values`:
 #       Mengambil judul film dari dataset `movies_prep` berdasarkan indeks film yang telah dipilih.
 # 
 # #### Output
@@ -299,13 +734,11 @@ print(get_recommendations('Avatar', 10))
 
 
 # Dapatkan skor similarity untuk film Avatar
-avatar_idx = indices['Avatar']
-sim_scores = list(enumerate(cos_sim[avatar_idx]))
-sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:11]  # Top 10
+avatar_idx = title_index.resolve('Avatar')
+rec_idx, similarity_scores = select_top_n(engine.scores(avatar_idx), 10, exclude=avatar_idx)  # Top 10
 
-# Ekstrak skor dan judul
-similarity_scores = [score for idx, score in sim_scores]
-movie_titles = movies_prep['title'].iloc[[idx for idx, score in sim_scores]].values
+# Ekstrak judul
+movie_titles = movies_prep['title'].iloc[rec_idx].values
 
 
 # ### Penjelasan Fungsi Kode
@@ -431,3 +864,48 @@ plt.show()
 #     - Namun, hal ini juga bisa menandakan adanya risiko **overfitting** pada fitur metadata yang digunakan.
 # 
 # Kesimpulan ini memberikan wawasan tentang performa model rekomendasi berbasis konten, sekaligus menunjukkan potensi area untuk perbaikan, seperti meningkatkan variasi rekomendasi.
+
+
+# ### Evaluasi Seluruh Katalog dan Re-ranking Diversitas
+# 
+# Evaluasi di atas hanya memeriksa satu film. Agar kualitas model dapat dipantau setiap kali model dibangun ulang, `evaluate_catalog` memakai **setiap** film sebagai query dan menghitung metrik untuk seluruh daftar top-10 sekaligus dengan operasi matriks per blok.
+# 
+# #### Penjelasan Kode
+# 1. **Metrik**:
+#     - `genre_precision`: Proporsi rekomendasi yang berbagi minimal satu genre dengan film query. Dihitung dengan operasi bitwise pada bitmap genre.
+#     - `intra_list_diversity`: Rata-rata `1 - cosine` antar pasangan film dalam satu daftar. Untuk vektor ber-norma L2, jumlah kemiripan antar pasangan sama dengan `|jumlah vektor|² - jumlah |vektor|²`, sehingga cukup satu perkalian sparse per blok daftar.
+#     - `coverage`: Proporsi katalog yang pernah muncul di daftar rekomendasi.
+#     - `popularity_bias`: Rata-rata persentil `popularity` film yang direkomendasikan (0.5 = netral, mendekati 1 = condong ke film populer).
+#     - `mean_score`: Rata-rata skor kemiripan (Mean@10).
+# 
+# 2. **Re-ranking MMR**:
+#     - `evaluate_catalog(model, top_n=10, diversity=d)`: Dengan `diversity > 0`, setiap daftar disusun ulang dengan MMR dari `5 x top_n` kandidat. Pemilihan greedy dijalankan untuk semua film sekaligus, dan kemiripan antar kandidat dihitung per blok.
+#     - Opsi yang sama tersedia di `get_recommendations(..., diversity=...)`, `model.recommend(..., diversity=...)`, dan parameter `diversity` pada layanan HTTP.
+# 
+# #### Output
+# Tabel metrik seluruh katalog untuk beberapa nilai `diversity` beserta waktu evaluasinya, serta rekomendasi "Avatar" tanpa dan dengan re-ranking.
+
+# In[ ]:
+
+
+catalog_eval = pd.DataFrame({d: evaluate_catalog(model, top_n=10, diversity=d) for d in (0.0, 0.3, 0.6)}).T
+catalog_eval.index.name = 'diversity'
+print(catalog_eval.round(4).to_string())
+print("\nRekomendasi 'Avatar' tanpa re-ranking:")
+print(get_recommendations('Avatar', 10))
+print("\nRekomendasi 'Avatar' dengan diversity=0.3:")
+print(get_recommendations('Avatar', 10, diversity=0.3))
+
+
+# ### Analisis Evaluasi Seluruh Katalog
+# 
+# 1. **Skala Evaluasi**:
+#     - Metrik dihitung untuk seluruh katalog dalam hitungan detik, sehingga evaluasi dapat dijalankan setiap kali model dibangun ulang, bukan hanya untuk satu contoh film.
+# 
+# 2. **Relevansi vs Keberagaman**:
+#     - Menaikkan `diversity` meningkatkan `intra_list_diversity` dan `coverage`, dengan penurunan kecil pada `mean_score`. Perlu dipantau juga apakah `genre_precision` ikut turun.
+#     - Nilai `diversity` sekitar 0.3 menjadi titik awal yang wajar. Nilai akhirnya dipilih dari tabel di atas sesuai kebutuhan produk.
+# 
+# 3. **Bias Popularitas**:
+#     - `popularity_bias` di atas 0.5 menunjukkan model condong merekomendasikan film populer, karena `popularity` ikut menjadi fitur. Re-ranking MMR membantu menampilkan film yang kurang populer tetapi tetap relevan.
+
@@ -0,0 +1,52 @@
+"""Komponen sistem rekomendasi film berbasis konten (TMDB).
+
+Submodul diimpor saat atributnya pertama kali diakses, sehingga
+``from recommender import RecommenderModel`` tidak ikut memuat ``pandas``,
+scikit-learn, atau modul build lain yang tidak dibutuhkan worker query.
+"""
+from importlib import import_module
+
+# nama publik -> submodul yang mendefinisikannya
+_EXPORTS = {
+    'EmbeddingEngine': 'embedding',
+    'FilterIndex': 'filters',
+    'IVFIndex': 'ann',
+    'NeighborIndex': 'neighbors',
+    'RecommendationService': 'service',
+    'RecommenderModel': 'model',
+    'ServiceThread': 'service',
+    'SimilarityEngine': 'similarity',
+    'StreamingFeatureBuilder': 'features',
+    'TitleIndex': 'titles',
+    'build_artifacts': 'pipeline',
+    'build_embedding': 'embedding',
+    'build_model_from_csv': 'features',
+    'build_neighbor_index': 'neighbors',
+    'evaluate_ann': 'ann',
+    'evaluate_catalog': 'evaluation',
+    'iter_prepared_batches': 'ingest',
+    'load_artifacts': 'artifacts',
+    'load_model': 'pipeline',
+    'load_prepared': 'ingest',
+    'mmr_rerank': 'ranking',
+    'normalize_rows': 'similarity',
+    'normalize_title': 'titles',
+    'query': 'pipeline',
+    'save_artifacts': 'artifacts',
+    'select_top_n': 'ranking',
+    'topk_rows': 'ranking',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,309 @@
+"""Penyimpanan artefak model: "fit sekali, simpan, lalu muat".
+
+Setiap penyimpanan menulis satu versi ``path/v-<id>/`` dan file penunjuk
+``path/CURRENT`` berisi nama versi yang aktif. Direktori versi berisi:
+
+- ``meta.json``: versi format, ukuran katalog, parameter vectorizer, dan
+  status vocabulary drift;
+- ``titles.json`` / ``genres.json``: judul dan daftar genre setiap film;
+- ``vocab_<nama>.json`` dan ``idf_<nama>.npy``: kosakata hasil fit;
+- ``feature_{data,indices,indptr}.npy``: ``feature_mat`` (ternormalisasi) dalam CSR;
+- ``neighbors_{data,indices,indptr}.npy``: indeks tetangga top-K (opsional);
+- ``popularity.npy``: ``popularity`` mentah per film (opsional);
+- ``metadata_<nama>.npy``: metadata numerik per film, mis. ``year`` (opsional);
+- ``ann_{centroids,labels,order}.npy`` dan ``ann_rows_{data,indices,indptr}.npy``:
+  indeks ANN (IVF) beserta ``feature_mat`` yang diurutkan per daftar
+  (opsional);
+- ``embedding.npy`` / ``embedding_components.npy``: embedding dense float32
+  dan matriks proyeksinya (opsional);
+- ``origin.npy`` / ``added_movies.json``: asal setiap baris dan record film
+  dari ``add_movies``, dipakai ``RecommenderModel.refit``;
+- ``title_keys.json``, ``title_key_ids.npy``, dan
+  ``title_postings_{data,indices,indptr}.npy``: judul ternormalisasi dan
+  inverted index trigram ``TitleIndex``.
+
+Semua array numerik disimpan **tanpa kompresi** sehingga bisa dimuat dengan
+``np.load(mmap_mode='r')``: banyak proses worker berbagi satu salinan di page
+cache dan model siap menjawab query dalam hitungan milidetik.
+
+Versi baru ditulis lengkap terlebih dahulu, lalu ``CURRENT`` diganti dengan
+``os.replace`` yang atomik di POSIX maupun Windows: pembaca selalu melihat
+versi lama atau versi baru yang utuh, tidak pernah ``path`` yang kosong.
+Direktori versi tidak pernah di-rename atau ditimpa, sehingga worker yang
+masih memetakan file versi lama (termasuk model yang dimuat dari ``path`` itu
+sendiri) tetap membaca data yang utuh, dan penyimpanan ulang tetap berhasil
+di Windows walaupun file lama sedang di-mmap. Artefak lama yang file-nya
+langsung berada di ``path`` (tanpa ``CURRENT``) tetap bisa dimuat.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from scipy import sparse
+
+from .ann import IVFIndex
+from .embedding import EmbeddingEngine
+from .model import RecommenderModel
+from .neighbors import NeighborIndex
+from .titles import N_TRIGRAMS, TitleIndex
+
+FORMAT_VERSION = 1
+
+# file penunjuk versi aktif di dalam direktori artefak
+CURRENT_FILE = 'CURRENT'
+
+# parameter TfidfVectorizer yang ikut disimpan (semuanya aman untuk JSON)
+TFIDF_PARAMS = (
+    'lowercase', 'stop_words', 'token_pattern', 'ngram_range', 'max_df', 'min_df',
+    'max_features', 'binary', 'norm', 'use_idf', 'smooth_idf', 'sublinear_tf',
+)
+
+
+def _save_json(path, obj):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False)
+
+
+def _load_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_csr(directory, prefix, mat):
+    mat = sparse.csr_matrix(mat)
+    for part in ('data', 'indices', 'indptr'):
+        np.save(os.path.join(directory, f'{prefix}_{part}.npy'), getattr(mat, part))
+
+
+def _load_csr(directory, prefix, shape, mmap_mode):
+    data, indices, indptr = (
+        np.load(os.path.join(directory, f'{prefix}_{part}.npy'), mmap_mode=mmap_mode)
+        for part in ('data', 'indices', 'indptr')
+    )
+    return sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+def vectorizer_state(vectorizer):
+    """Ubah vectorizer hasil fit menjadi ``(state_json, arrays)``."""
+    if hasattr(vectorizer, 'classes_'):
+        return {'kind': 'multilabel', 'classes': list(map(str, vectorizer.classes_))}, {}
+    params = vectorizer.get_params()
+    state = {'kind': 'tfidf', 'params': {name: params[name] for name in TFIDF_PARAMS}}
+    if isinstance(state['params']['stop_words'], (set, frozenset)):
+        state['params']['stop_words'] = sorted(state['params']['stop_words'])
+    vocabulary = {term: int(i) for term, i in vectorizer.vocabulary_.items()}
+    return state, {'vocab': vocabulary, 'idf': np.asarray(vectorizer.idf_)}
+
+
+def vectorizer_from_state(state, vocabulary=None, idf=None):
+    """Bangun kembali vectorizer siap ``transform`` tanpa fit ulang."""
+    if state['kind'] == 'multilabel':
+        from sklearn.preprocessing import MultiLabelBinarizer
+
+        return MultiLabelBinarizer(classes=state['classes']).fit([])
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    params = dict(state['params'])
+    params['ngram_range'] = tuple(params['ngram_range'])
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, **params)
+    vectorizer.idf_ = np.asarray(idf)
+    return vectorizer
+
+
+def _current_version(path):
+    """Nama versi aktif di ``path``, atau ``None`` untuk artefak tanpa ``CURRENT``."""
+    try:
+        with open(os.path.join(path, CURRENT_FILE), encoding='utf-8') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def save_artifacts(model, path):
+    """Simpan ``RecommenderModel`` sebagai versi baru di direktori ``path``.
+
+    Versi aktif sebelumnya dipertahankan untuk pembaca yang baru saja membaca
+    ``CURRENT``; versi yang lebih lama dihapus. File yang masih dipetakan
+    tetap valid setelah di-unlink di POSIX; di Windows file tersebut terkunci
+    sehingga dilewati dan dihapus pada penyimpanan berikutnya.
+    """
+    path = os.path.abspath(path)
+    os.makedirs(path, exist_ok=True)
+    previous = _current_version(path)
+    version = tempfile.mkdtemp(prefix='v-', dir=path)
+    # mkdtemp membuat direktori 0700; artefak harus terbaca oleh worker lain
+    os.chmod(version, 0o755)
+    try:
+        _write_artifacts(model, version)
+    except BaseException:
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+    fd, pointer = tempfile.mkstemp(prefix=f'.{CURRENT_FILE}-', dir=path)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(version))
+    os.chmod(pointer, 0o644)
+    os.replace(pointer, os.path.join(path, CURRENT_FILE))
+    if previous is None:
+        # artefak lama (file langsung di ``path``) dibiarkan sampai penyimpanan berikutnya
+        return
+    keep = {CURRENT_FILE, os.path.basename(version), previous}
+    for entry in os.listdir(path):
+        if entry in keep:
+            continue
+        full = os.path.join(path, entry)
+        if os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
+        else:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def _write_artifacts(model, path):
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'n_items': model.n_items,
+        'n_features': model.engine.feature_mat.shape[1],
+        'vectorizers': {},
+        'has_neighbors': model.neighbor_index is not None,
+        'has_title_index': True,
+        'has_popularity': model.popularity is not None,
+        'metadata': sorted(model.metadata),
+        'ann': {'n_probe': model.ann_index.n_probe} if model.ann_index is not None else None,
+        'embedding': None,
+        'drift': {
+            'oov_baseline': model.oov_baseline,
+            'tokens': model._drift_tokens,
+            'unknown': model._drift_unknown,
+        },
+    }
+    for name, (state, arrays) in model.vectorizer_states().items():
+        meta['vectorizers'][name] = state
+        if 'vocab' in arrays:
+            _save_json(os.path.join(path, f'vocab_{name}.json'), arrays['vocab'])
+            np.save(os.path.join(path, f'idf_{name}.npy'), arrays['idf'])
+    _save_json(os.path.join(path, 'titles.json'), list(model.titles))
+    _save_json(os.path.join(path, 'genres.json'), [list(g) for g in model.genres])
+    _save_csr(path, 'feature', model.engine.feature_mat)
+    title_arrays = model.title_index.arrays()
+    _save_json(os.path.join(path, 'title_keys.json'), title_arrays['keys'])
+    np.save(os.path.join(path, 'title_key_ids.npy'), title_arrays['key_ids'])
+    _save_csr(path, 'title_postings', title_arrays['postings'])
+    if model.neighbor_index is not None:
+        _save_csr(path, 'neighbors', model.neighbor_index.graph)
+    if model.ann_index is not None:
+        np.save(os.path.join(path, 'ann_centroids.npy'), model.ann_index.centroids)
+        np.save(os.path.join(path, 'ann_labels.npy'), model.ann_index.labels)
+        order, _, rows = model.ann_index._inverted_lists(model.engine)
+        np.save(os.path.join(path, 'ann_order.npy'), order)
+        _save_csr(path, 'ann_rows', rows)
+        meta['ann']['lists'] = True
+    if model.popularity is not None:
+        np.save(os.path.join(path, 'popularity.npy'), model.popularity)
+    for name, values in model.metadata.items():
+        np.save(os.path.join(path, f'metadata_{name}.npy'), values)
+    np.save(os.path.join(path, 'origin.npy'), model._origin)
+    if model._added:
+        _save_json(os.path.join(path, 'added_movies.json'), model._added)
+    if model.embedding is not None:
+        embedding = model.embedding
+        np.save(os.path.join(path, 'embedding.npy'), embedding.embeddings)
+        np.save(os.path.join(path, 'embedding_components.npy'), embedding.components)
+        meta['embedding'] = {
+            'blocks': embedding.blocks,
+            'weights': embedding.weights,
+            'popularity_scale': embedding.popularity_scale,
+        }
+    # meta.json ditulis terakhir: direktori tanpa meta dianggap belum lengkap
+    _save_json(os.path.join(path, 'meta.json'), meta)
+
+
+def load_artifacts(path, mmap=True):
+    """Muat artefak dari ``path`` dan kembalikan ``RecommenderModel``.
+
+    Dengan ``mmap=True`` array CSR tidak dibaca ke memori melainkan dipetakan
+    (read-only) dari file. Vectorizer baru dibangun ketika dibutuhkan untuk
+    ``transform``, sehingga proses yang hanya menjawab query tidak perlu
+    mengimpor scikit-learn.
+    """
+    version = _current_version(path)
+    if version is not None:
+        path = os.path.join(path, version)
+    meta = _load_json(os.path.join(path, 'meta.json'))
+    if meta['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"format artefak {meta['format_version']} tidak didukung")
+    mmap_mode = 'r' if mmap else None
+    n = meta['n_items']
+    feature_mat = _load_csr(path, 'feature', (n, meta['n_features']), mmap_mode)
+    neighbor_index = None
+    if meta['has_neighbors']:
+        neighbor_index = NeighborIndex(_load_csr(path, 'neighbors', (n, n), mmap_mode))
+    ann_index = None
+    if meta.get('ann') is not None:
+        lists = {}
+        if meta['ann'].get('lists'):
+            lists = {
+                'order': np.load(os.path.join(path, 'ann_order.npy'), mmap_mode=mmap_mode),
+                'rows': _load_csr(path, 'ann_rows', (n, meta['n_features']), mmap_mode),
+            }
+        ann_index = IVFIndex(
+            np.load(os.path.join(path, 'ann_centroids.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'ann_labels.npy'), mmap_mode=mmap_mode),
+            n_probe=meta['ann']['n_probe'],
+            **lists,
+        )
+    popularity = None
+    if meta.get('has_popularity'):
+        popularity = np.load(os.path.join(path, 'popularity.npy'))
+    metadata = {
+        name: np.load(os.path.join(path, f'metadata_{name}.npy'), mmap_mode=mmap_mode)
+        for name in meta.get('metadata', [])
+    }
+    embedding = None
+    if meta.get('embedding') is not None:
+        embedding = EmbeddingEngine(
+            np.load(os.path.join(path, 'embedding.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'embedding_components.npy')),
+            **meta['embedding'],
+        )
+
+    def load_vectorizer(name, state):
+        if state['kind'] == 'multilabel':
+            return vectorizer_from_state(state)
+        vocabulary = _load_json(os.path.join(path, f'vocab_{name}.json'))
+        idf = np.load(os.path.join(path, f'idf_{name}.npy'))
+        return vectorizer_from_state(state, vocabulary, idf)
+
+    drift = meta.get('drift') or {}
+    model = RecommenderModel(
+        feature_mat,
+        _load_json(os.path.join(path, 'titles.json')),
+        genres=_load_json(os.path.join(path, 'genres.json')),
+        popularity=popularity,
+        metadata=metadata,
+        vectorizers=lambda: {name: load_vectorizer(name, state) for name, state in meta['vectorizers'].items()},
+        neighbor_index=neighbor_index,
+        ann_index=ann_index,
+        embedding=embedding,
+        assume_normalized=True,
+        oov_baseline=drift.get('oov_baseline', 0.0),
+    )
+    model._drift_tokens = drift.get('tokens', 0)
+    model._drift_unknown = drift.get('unknown', 0)
+    if os.path.exists(os.path.join(path, 'origin.npy')):
+        model._origin = np.load(os.path.join(path, 'origin.npy'))
+    if os.path.exists(os.path.join(path, 'added_movies.json')):
+        model._added = _load_json(os.path.join(path, 'added_movies.json'))
+    if meta.get('has_title_index'):
+        keys = _load_json(os.path.join(path, 'title_keys.json'))
+        model._title_index = TitleIndex(
+            model.titles,
+            years=model.metadata.get('year'),
+            keys=keys,
+            key_ids=np.load(os.path.join(path, 'title_key_ids.npy'), mmap_mode=mmap_mode),
+            postings=_load_csr(path, 'title_postings', (N_TRIGRAMS, len(keys)), mmap_mode),
+        )
+    return model
@@ -0,0 +1,281 @@
+"""Benchmark pipeline rekomendasi pada katalog sintetis berbentuk TMDB.
+
+``generate_catalog`` menulis CSV dengan kolom yang sama dengan
+``tmdb_5000_movies.csv``: JSON ``genres``/``keywords`` bergaya TMDB, teks
+``overview`` dengan distribusi kata Zipf, ``popularity`` log-normal, serta
+``release_date``/``runtime``. ``run_benchmark`` mengukur setiap tahap
+pipeline yang dipakai notebook dan ``build_artifacts`` secara terpisah (baca
+CSV, parse JSON, ``StreamingFeatureBuilder``, ``TitleIndex``,
+``build_neighbor_index``, dan latensi per query p50/p99) beserta peak RSS
+proses. Latensi query mencakup jalur query yang sebenarnya:
+``TitleIndex.resolve``, skor, ``select_top_n``, dan pembentukan baris hasil.
+
+Jalankan dengan::
+
+    python -m recommender.benchmark --sizes 5000 50000 500000 --output bench.json
+
+Setiap ukuran dijalankan di proses terpisah agar peak RSS tidak tercampur.
+CSV sintetis secara default disimpan di direktori temp sistem
+(``DEFAULT_DATA_DIR``), bukan di direktori kerja.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from .ingest import CSV_COLUMNS, prepare_batch
+from .ranking import select_top_n
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'recommender-benchmark')
+# batas ukuran katalog untuk tahap ``build_neighbor_index`` yang kuadratik
+NEIGHBOR_MAX_ITEMS = 100000
+
+# 20 genre TMDB beserta id aslinya, diurutkan kira-kira dari yang paling sering
+TMDB_GENRES = [
+    (18, 'Drama'), (35, 'Comedy'), (53, 'Thriller'), (28, 'Action'), (10749, 'Romance'),
+    (12, 'Adventure'), (80, 'Crime'), (878, 'Science Fiction'), (27, 'Horror'), (10751, 'Family'),
+    (14, 'Fantasy'), (9648, 'Mystery'), (16, 'Animation'), (36, 'History'), (10402, 'Music'),
+    (10752, 'War'), (99, 'Documentary'), (37, 'Western'), (10770, 'TV Movie'), (10769, 'Foreign'),
+]
+TMDB_COLUMNS = [
+    'budget', 'genres', 'homepage', 'id', 'keywords', 'original_language', 'original_title',
+    'overview', 'popularity', 'production_companies', 'production_countries', 'release_date',
+    'revenue', 'runtime', 'spoken_languages', 'status', 'tagline', 'title', 'vote_average', 'vote_count',
+]
+_STOP_WORDS = ['the', 'a', 'of', 'and', 'to', 'in', 'his', 'her', 'is', 'with', 'when', 'who', 'an', 'their']
+_SYLLABLES = ['ka', 'ro', 'mi', 'ten', 'dor', 'la', 'vi', 'sel', 'an', 'tro', 'bel', 'quin', 'ha', 'zu', 'mor', 'ey']
+
+
+def _zipf_probs(size, exponent=1.1):
+    probs = 1.0 / np.arange(1, size + 1) ** exponent
+    return probs / probs.sum()
+
+
+def _pseudo_words(rng, size, min_syllables=2, max_syllables=4):
+    words = set()
+    while len(words) < size:
+        n = rng.integers(min_syllables, max_syllables + 1)
+        words.add(''.join(rng.choice(_SYLLABLES, n)))
+    return sorted(words)
+
+
+def _names_json(ids, names):
+    # nama sintetis tidak mengandung tanda kutip, jadi cukup format string biasa
+    return '[' + ', '.join(f'{{"id": {i}, "name": "{name}"}}' for i, name in zip(ids, names)) + ']'
+
+
+def _split(values, counts):
+    return np.split(values, np.cumsum(counts)[:-1])
+
+
+def generate_catalog(n_items, path, seed=0, chunk_size=50000, overview_vocab=20000, keyword_vocab=10000):
+    """Tulis katalog sintetis ``n_items`` film berformat TMDB ke ``path`` (CSV)."""
+    rng = np.random.default_rng(seed)
+    # peringkat Zipf diacak agar kata paling sering tidak selalu berurutan alfabetis
+    words = np.array(list(rng.permutation(_pseudo_words(rng, overview_vocab))) + _STOP_WORDS, dtype=object)
+    word_probs = np.concatenate([_zipf_probs(overview_vocab) * 0.7, np.full(len(_STOP_WORDS), 0.3 / len(_STOP_WORDS))])
+    keywords = np.array([
+        f'{word} {suffix}'.strip()
+        for word, suffix in zip(rng.permutation(_pseudo_words(rng, keyword_vocab)), rng.choice(['', 'war', 'love', 'city'], keyword_vocab))
+    ], dtype=object)
+    keyword_probs = _zipf_probs(keyword_vocab)
+    genre_ids = np.array([g[0] for g in TMDB_GENRES])
+    genre_names = np.array([g[1] for g in TMDB_GENRES], dtype=object)
+    genre_logp = np.log(_zipf_probs(len(TMDB_GENRES), exponent=0.8))
+    title_words = np.array(_pseudo_words(rng, 3000, 1, 3), dtype=object)
+    for start in range(0, n_items, chunk_size):
+        n = min(chunk_size, n_items - start)
+        ids = np.arange(start, start + n)
+        # 1-4 genre per film tanpa pengembalian (trik Gumbel top-k)
+        n_genres = rng.integers(1, 5, n)
+        genre_rank = np.argsort(-(genre_logp + rng.gumbel(size=(n, len(TMDB_GENRES)))), axis=1)
+        genre_rows = [_names_json(genre_ids[g[:c]], genre_names[g[:c]]) for g, c in zip(genre_rank, n_genres)]
+        n_keywords = np.minimum(rng.poisson(6, n), 30)
+        keyword_rows = [
+            _names_json(k, keywords[k])
+            for k in (np.unique(k) for k in _split(rng.choice(keyword_vocab, n_keywords.sum(), p=keyword_probs), n_keywords))
+        ]
+        n_words = np.where(rng.random(n) < 0.02, 0, rng.integers(15, 80, n))
+        overviews = [
+            ' '.join(words[w]).capitalize() if w.size else None
+            for w in _split(rng.choice(words.size, n_words.sum(), p=word_probs), n_words)
+        ]
+        # judul 2-4 kata; sebagian kecil sengaja sama dengan film lain (remake)
+        n_title_words = rng.integers(2, 5, n)
+        titles = [
+            ' '.join(t).title()
+            for t in _split(title_words[rng.integers(0, title_words.size, n_title_words.sum())], n_title_words)
+        ]
+        years = rng.integers(1916, 2017, n)
+        chunk = pd.DataFrame({
+            'budget': rng.integers(0, 300, n) * 1_000_000,
+            'genres': genre_rows,
+            'homepage': '',
+            'id': ids,
+            'keywords': keyword_rows,
+            'original_language': rng.choice(['en', 'fr', 'es', 'ja', 'de'], n, p=[0.8, 0.06, 0.05, 0.05, 0.04]),
+            'original_title': titles,
+            'overview': overviews,
+            'popularity': rng.lognormal(2.0, 1.2, n),
+            'production_companies': '[]',
+            'production_countries': '[]',
+            'release_date': [f'{y}-{m:02d}-{d:02d}' for y, m, d in zip(years, rng.integers(1, 13, n), rng.integers(1, 29, n))],
+            'revenue': rng.integers(0, 1000, n) * 1_000_000,
+            'runtime': rng.normal(107, 20, n).clip(60, 240).round(),
+            'spoken_languages': '[]',
+            'status': 'Released',
+            'tagline': '',
+            'title': titles,
+            'vote_average': rng.uniform(1, 10, n).round(1),
+            'vote_count': rng.integers(0, 15000, n),
+        }, columns=TMDB_COLUMNS)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return path
+
+
+def _peak_rss_mb():
+    """Peak RSS proses (MB), atau ``None`` jika tidak bisa diukur."""
+    try:
+        import resource
+    except ImportError:
+        # modul ``resource`` hanya ada di Unix; di Windows pakai psutil bila ada
+        try:
+            import psutil
+        except ImportError:
+            return None
+        peak = getattr(psutil.Process().memory_info(), 'peak_wset', None)
+        return peak / (1024 * 1024) if peak is not None else None
+    # ru_maxrss dalam kilobyte di Linux dan byte di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(path, n_queries=200, top_n=10, seed=0, chunksize=10000, neighbors=50,
+                  neighbor_max_items=NEIGHBOR_MAX_ITEMS):
+    """Jalankan pipeline yang dipakai notebook dan ``build_artifacts`` pada
+    CSV ``path`` dan ukur setiap tahap.
+
+    Tahap ``features`` menjalankan ``StreamingFeatureBuilder`` per potongan
+    ``chunksize`` baris, sama seperti ``build_model_from_csv``. Tahap
+    ``neighbor_index`` (``build_neighbor_index`` dengan ``k=neighbors``)
+    biayanya kuadratik terhadap jumlah film, sehingga dilewati (``None``)
+    bila ``neighbors=0`` atau katalog lebih besar dari ``neighbor_max_items``.
+
+    Returns
+    -------
+    dict : waktu per tahap (detik), ``query_p50_ms``/``query_p99_ms``, dan
+        peak RSS (MB) setelah setiap tahap (``rss_<tahap>_mb``)
+    """
+    from .features import StreamingFeatureBuilder
+    from .neighbors import build_neighbor_index
+
+    result = {'n_items': None}
+
+    def stage(name, func):
+        start = time.perf_counter()
+        value = func()
+        result[f'{name}_s'] = time.perf_counter() - start
+        result[f'rss_{name}_mb'] = _peak_rss_mb()
+        return value
+
+    def build_features():
+        builder = StreamingFeatureBuilder()
+        for start in range(0, len(prepared), chunksize):
+            builder.partial_fit(prepared.iloc[start:start + chunksize])
+        return builder.finalize()
+
+    raw = stage('csv_load', lambda: pd.read_csv(path, usecols=CSV_COLUMNS))
+    result['n_items'] = len(raw)
+    prepared = stage('json_parse', lambda: prepare_batch(raw))
+    del raw
+    model = stage('features', build_features)
+    del prepared
+    title_index = stage('title_index', lambda: model.title_index)
+    if neighbors and model.n_items <= neighbor_max_items:
+        stage('neighbor_index', lambda: build_neighbor_index(
+            model.engine.feature_mat, k=neighbors, assume_normalized=True,
+        ))
+    else:
+        result['neighbor_index_s'] = result['rss_neighbor_index_mb'] = None
+
+    engine, titles = model.engine, model.titles
+    queries = np.random.default_rng(seed).choice(engine.n_items, min(n_queries, engine.n_items), replace=False)
+    latencies, responses = [], []
+    for query in queries:
+        title = titles[query]
+        start = time.perf_counter()
+        idx = title_index.resolve(title)
+        rec_idx, scores = select_top_n(engine.scores(idx), top_n, exclude=idx)
+        responses.append(model._records(rec_idx, scores))
+        latencies.append(time.perf_counter() - start)
+    result['n_recommendations'] = sum(len(r) for r in responses)
+    result['query_p50_ms'] = float(np.percentile(latencies, 50) * 1000)
+    result['query_p99_ms'] = float(np.percentile(latencies, 99) * 1000)
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def catalog_path(data_dir, n_items, seed=0):
+    """Path CSV sintetis untuk ``n_items`` dan ``seed``; dibangkitkan bila belum ada.
+
+    CSV ditulis ke file sementara di ``data_dir`` lalu di-rename, sehingga
+    file yang terpotong karena proses terhenti tidak pernah dipakai ulang.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'tmdb_synthetic_{n_items}_seed{seed}.csv')
+    if not os.path.exists(path):
+        fd, partial = tempfile.mkstemp(prefix=f'tmdb_synthetic_{n_items}_seed{seed}.', suffix='.part', dir=data_dir)
+        os.close(fd)
+        try:
+            generate_catalog(n_items, partial, seed=seed)
+            os.replace(partial, path)
+        except BaseException:
+            os.remove(partial)
+            raise
+    return path
+
+
+def _run_size(n_items, data_dir, n_queries, seed, neighbors):
+    return run_benchmark(catalog_path(data_dir, n_items, seed), n_queries=n_queries, seed=seed, neighbors=neighbors)
+
+
+def benchmark_sizes(sizes=(5000, 50000, 500000), data_dir=DEFAULT_DATA_DIR, n_queries=200, seed=0, neighbors=50):
+    """Jalankan ``run_benchmark`` untuk setiap ukuran katalog di proses baru.
+
+    CSV sintetis disimpan di ``data_dir`` dan dipakai ulang bila sudah ada
+    untuk ukuran dan ``seed`` yang sama.
+    """
+    results = []
+    for n_items in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            results.append(pool.submit(_run_size, n_items, data_dir, n_queries, seed, neighbors).result())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pipeline rekomendasi pada katalog sintetis')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000, 500000])
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='direktori CSV sintetis (dipakai ulang)')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--neighbors', type=int, default=50,
+                        help=f'k build_neighbor_index (0 = lewati; dilewati di atas {NEIGHBOR_MAX_ITEMS} film)')
+    parser.add_argument('--output', help='simpan hasil sebagai JSON')
+    args = parser.parse_args(argv)
+    results = benchmark_sizes(args.sizes, args.data_dir, args.queries, args.seed, args.neighbors)
+    table = pd.DataFrame(results).set_index('n_items')
+    print(table[[c for c in table.columns if not c.startswith('rss_')]].round(3).T.to_string())
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Mode embedding dense: ``feature_mat`` diproyeksikan ke beberapa dimensi float32.
+
+``feature_mat`` asli adalah gabungan one-hot genre, ribuan term TF-IDF, dan
+kolom ``popularity`` mentah yang nilainya jauh lebih besar dari kolom lain
+sehingga mendominasi cosine similarity. Pada mode ini setiap blok fitur
+diskalakan terlebih dahulu (norma L2 per blok, popularity dalam skala log
+0..1, lalu diberi bobot), kemudian diproyeksikan dengan ``TruncatedSVD`` ke
+``n_components`` dimensi float32. Similarity menjadi perkalian BLAS dense atas
+array n x d yang kontigu, sehingga latensi per query lebih dapat diprediksi.
+"""
+import numpy as np
+from scipy import sparse
+
+from .ranking import topk_rows
+from .similarity import _unit_profile, normalize_rows
+
+# bobot setiap blok fitur setelah diskalakan
+BLOCK_WEIGHTS = {'genres': 1.0, 'overview': 1.0, 'keywords': 1.0, 'popularity': 0.25}
+
+
+def feature_blocks(vectorizers):
+    """Rentang kolom ``[start, stop)`` setiap blok pada ``feature_mat``."""
+    sizes = {
+        'genres': len(vectorizers['genres'].classes_),
+        'overview': len(vectorizers['overview'].vocabulary_),
+        'keywords': len(vectorizers['keywords'].vocabulary_),
+        'popularity': 1,
+    }
+    blocks, start = {}, 0
+    for name, size in sizes.items():
+        blocks[name] = [start, start + size]
+        start += size
+    return blocks
+
+
+def _scale_blocks(feature_mat, blocks, weights, popularity, popularity_scale):
+    """Skalakan setiap blok fitur agar tidak ada blok yang mendominasi.
+
+    Norma L2 per blok tidak bergantung pada skala baris, jadi ``feature_mat``
+    boleh mentah maupun sudah dinormalisasi; nilai popularity mentah
+    diberikan terpisah lewat ``popularity``.
+    """
+    feature_mat = sparse.csr_matrix(feature_mat)
+    parts = []
+    for name, (start, stop) in blocks.items():
+        if name == 'popularity':
+            pop = np.log1p(np.maximum(np.asarray(popularity, dtype=np.float64), 0)) / popularity_scale
+            parts.append(sparse.csr_matrix(weights[name] * pop[:, np.newaxis]))
+        else:
+            parts.append(weights[name] * normalize_rows(feature_mat[:, start:stop]))
+    return sparse.hstack(parts, format='csr')
+
+
+class EmbeddingEngine:
+    """Engine similarity di atas embedding dense float32 (n_film x d).
+
+    Menyediakan antarmuka query yang sama dengan ``SimilarityEngine``
+    (``query_vector``, ``scores``, ``query_scores``, ``profile_vector``,
+    ``batch_scores``, ``top_n_batch``, ``gram``) sehingga bisa dipakai
+    ``RecommenderModel`` dan ``mmr_rerank``, tetapi tidak memiliki
+    ``feature_mat``: indeks yang membutuhkannya (tetangga, ANN) selalu memakai
+    engine sparse.
+
+    Parameter
+    ---------
+    embeddings : array (n_film x d), baris ber-norma L2
+    components : array (d x n_fitur), matriks proyeksi hasil ``TruncatedSVD``
+    blocks : dict ``nama -> [start, stop)`` blok fitur (lihat ``feature_blocks``)
+    weights : dict bobot setiap blok
+    popularity_scale : float
+        ``log1p`` popularity maksimum saat fit, pembagi skala popularity.
+    """
+
+    def __init__(self, embeddings, components, blocks, weights, popularity_scale):
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.blocks = blocks
+        self.weights = weights
+        self.popularity_scale = popularity_scale
+
+    @classmethod
+    def fit(cls, feature_mat, blocks, popularity, n_components=128, weights=None, seed=0):
+        """Latih proyeksi ``TruncatedSVD`` dan hitung embedding seluruh katalog."""
+        from sklearn.decomposition import TruncatedSVD
+
+        weights = dict(BLOCK_WEIGHTS, **(weights or {}))
+        popularity_scale = float(np.log1p(np.max(popularity, initial=0.0))) or 1.0
+        scaled = _scale_blocks(feature_mat, blocks, weights, popularity, popularity_scale)
+        n_components = min(n_components, scaled.shape[1] - 1, scaled.shape[0] - 1)
+        svd = TruncatedSVD(n_components=n_components, random_state=seed).fit(scaled)
+        engine = cls(np.empty((0, n_components)), svd.components_, blocks, weights, popularity_scale)
+        engine.embeddings = engine._project(scaled)
+        return engine
+
+    def _project(self, scaled):
+        embeddings = np.asarray(scaled @ self.components.T, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(embeddings / norms)
+
+    def embed(self, rows):
+        """Embedding untuk baris ``feature_mat`` mentah (mis. hasil ``transform_batch``)."""
+        rows = sparse.csr_matrix(rows)
+        start, stop = self.blocks['popularity']
+        popularity = rows[:, start:stop].toarray().ravel()
+        return self._project(_scale_blocks(rows, self.blocks, self.weights, popularity, self.popularity_scale))
+
+    @property
+    def n_items(self):
+        return self.embeddings.shape[0]
+
+    @property
+    def n_components(self):
+        return self.embeddings.shape[1]
+
+    def append_rows(self, rows):
+        self.embeddings = np.vstack([self.embeddings, self.embed(rows)])
+
+    def select_rows(self, keep):
+        self.embeddings = np.ascontiguousarray(self.embeddings[np.asarray(keep, dtype=bool)])
+
+    def query_vector(self, idx):
+        return self.embeddings[idx]
+
+    def scores(self, idx):
+        return self.query_scores(self.query_vector(idx))
+
+    def query_scores(self, query, candidates=None):
+        if candidates is None:
+            return self.embeddings @ query
+        return self.embeddings[candidates] @ query
+
+    def profile_vector(self, idx, weights):
+        return _unit_profile(np.asarray(weights, dtype=np.float32) @ self.embeddings[idx])
+
+    def batch_scores(self, idx):
+        return self.embeddings[idx] @ self.embeddings.T
+
+    def top_n_batch(self, idx, top_n, chunk_size=256):
+        """Top-N per film di ``idx`` seperti ``SimilarityEngine.top_n_batch``."""
+        idx = np.asarray(idx, dtype=np.intp).ravel()
+        top_n = min(top_n, self.n_items - 1)
+        indices = np.empty((idx.size, top_n), dtype=np.int32)
+        scores = np.empty((idx.size, top_n), dtype=np.float32)
+        for start in range(0, idx.size, chunk_size):
+            chunk = idx[start:start + chunk_size]
+            block = self.batch_scores(chunk)
+            block[np.arange(chunk.size), chunk] = -np.inf
+            indices[start:start + chunk.size], scores[start:start + chunk.size] = topk_rows(block, top_n)
+        return indices, scores
+
+    def gram(self, idx, chunk_size=None):
+        # ``chunk_size`` hanya untuk kesamaan antarmuka; m x d dense sudah kecil
+        rows = self.embeddings[np.asarray(idx, dtype=np.intp)]
+        return np.matmul(rows, rows.transpose(0, 2, 1))
+
+
+def build_embedding(model, n_components=128, weights=None, seed=0):
+    """Bangun ``EmbeddingEngine`` dari ``RecommenderModel`` yang sudah ada."""
+    if model.popularity is None:
+        raise ValueError('build_embedding membutuhkan model.popularity')
+    blocks = feature_blocks(model.vectorizers)
+    return EmbeddingEngine.fit(
+        model.engine.feature_mat, blocks, model.popularity,
+        n_components=n_components, weights=weights, seed=seed,
+    )
@@ -0,0 +1,199 @@
+"""Feature engineering inkremental untuk katalog besar.
+
+``StreamingFeatureBuilder`` menerima potongan ``movies_prep`` satu per satu
+(lihat ``ingest.iter_prepared_batches``) dan hanya menyimpan hitungan term
+dalam bentuk sparse, bukan teks mentahnya. Setelah semua potongan masuk,
+kosakata dipangkas ke ``max_features`` term paling sering, IDF dihitung dari
+document frequency, dan hasilnya sama dengan ``MultiLabelBinarizer`` +
+``TfidfVectorizer`` yang di-fit pada seluruh data sekaligus (kecuali urutan
+term dengan frekuensi sama persis di batas ``max_features``, yang di sini
+diputus secara alfabetis).
+"""
+import numpy as np
+from scipy import sparse
+
+from .artifacts import TFIDF_PARAMS, vectorizer_from_state
+from .ingest import METADATA_COLUMNS, iter_prepared_batches
+from .model import RecommenderModel
+from .similarity import normalize_rows
+
+
+class _TermCounter:
+    """Hitungan term per dokumen dengan kosakata yang tumbuh bertahap."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.vocabulary = {}
+        self.n_docs = 0
+        self.n_tokens = 0
+        self.n_pruned = 0
+        self._blocks = []
+
+    def partial_fit(self, docs):
+        vocabulary = self.vocabulary
+        indices, counts, indptr = [], [], [0]
+        for doc in docs:
+            doc_counts = {}
+            for term in self.analyzer(doc):
+                j = vocabulary.setdefault(term, len(vocabulary))
+                doc_counts[j] = doc_counts.get(j, 0) + 1
+            indices.extend(doc_counts)
+            counts.extend(doc_counts.values())
+            indptr.append(len(indices))
+        self._blocks.append((
+            np.asarray(counts, dtype=np.int32),
+            np.asarray(indices, dtype=np.int32),
+            np.asarray(indptr, dtype=np.int64),
+        ))
+        self.n_docs += len(indptr) - 1
+
+    def _count_matrix(self):
+        counts = np.concatenate([b[0] for b in self._blocks]) if self._blocks else np.empty(0, np.int32)
+        indices = np.concatenate([b[1] for b in self._blocks]) if self._blocks else np.empty(0, np.int32)
+        indptr, offset = [np.zeros(1, dtype=np.int64)], 0
+        for block in self._blocks:
+            indptr.append(block[2][1:] + offset)
+            offset += block[2][-1]
+        return sparse.csr_matrix(
+            (counts, indices, np.concatenate(indptr)),
+            shape=(self.n_docs, len(self.vocabulary)),
+        )
+
+    def finalize(self, max_features=None):
+        """Kembalikan ``(tfidf_mat, vocabulary, idf)`` seperti ``TfidfVectorizer``.
+
+        ``n_tokens`` dan ``n_pruned`` mencatat jumlah token korpus dan token
+        yang hilang karena kosakata dipangkas ke ``max_features``.
+        """
+        counts = self._count_matrix()
+        terms = sorted(self.vocabulary)
+        alpha_ids = np.array([self.vocabulary[t] for t in terms], dtype=np.intp)
+        selected = np.arange(len(terms))
+        term_freq = np.bincount(counts.indices, weights=counts.data, minlength=len(terms))
+        if max_features is not None and len(terms) > max_features:
+            by_freq = np.argsort(-term_freq[alpha_ids], kind='stable')
+            selected = np.sort(by_freq[:max_features])
+        self.n_tokens = int(term_freq.sum())
+        self.n_pruned = self.n_tokens - int(term_freq[alpha_ids[selected]].sum())
+        counts = counts[:, alpha_ids[selected]].tocsr()
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log((1.0 + self.n_docs) / (1.0 + doc_freq)) + 1.0
+        tfidf = normalize_rows(counts.multiply(idf[np.newaxis, :]))
+        vocabulary = {terms[p]: i for i, p in enumerate(selected)}
+        return tfidf, vocabulary, idf
+
+
+def _keyword_docs(batch):
+    return [' '.join(k) for k in batch['keywords_list']]
+
+
+def transform_batch(vectorizers, batch):
+    """Ubah potongan ``movies_prep`` menjadi baris ``feature_mat`` memakai
+    kosakata yang sudah di-fit (tanpa fit ulang).
+
+    Genre yang tidak dikenal ``MultiLabelBinarizer`` diabaikan.
+    """
+    known_genres = set(vectorizers['genres'].classes_)
+    genres = [[g for g in genres if g in known_genres] for genres in batch['genres_list']]
+    return sparse.hstack([
+        sparse.csr_matrix(vectorizers['genres'].transform(genres)),
+        vectorizers['overview'].transform(batch['overview'].fillna('')),
+        vectorizers['keywords'].transform(_keyword_docs(batch)),
+        sparse.csr_matrix(batch['popularity'].to_numpy(dtype=np.float64)[:, np.newaxis]),
+    ], format='csr')
+
+
+def vocabulary_coverage(vectorizers, batch):
+    """Hitung ``(n_token, n_token_di_luar_kosakata)`` pada potongan ``batch``.
+
+    Dipakai untuk mengukur vocabulary drift: semakin banyak token (dan genre)
+    baru yang tidak dikenal, semakin besar alasan untuk fit ulang penuh.
+    Token yang dipangkas ``max_features`` juga terhitung tidak dikenal, jadi
+    hasilnya dibandingkan dengan ``RecommenderModel.oov_baseline``.
+    """
+    known_genres = set(vectorizers['genres'].classes_)
+    genres = [g for genres in batch['genres_list'] for g in genres]
+    n_tokens = len(genres)
+    n_unknown = sum(g not in known_genres for g in genres)
+    for name, docs in (('overview', batch['overview'].fillna('')), ('keywords', _keyword_docs(batch))):
+        vectorizer = vectorizers[name]
+        analyzer, vocabulary = vectorizer.build_analyzer(), vectorizer.vocabulary_
+        for doc in docs:
+            tokens = analyzer(doc)
+            n_tokens += len(tokens)
+            n_unknown += sum(t not in vocabulary for t in tokens)
+    return n_tokens, n_unknown
+
+
+class StreamingFeatureBuilder:
+    """Bangun ``feature_mat`` dari potongan ``movies_prep`` dengan memori terbatas.
+
+    Parameter
+    ---------
+    max_overview_features, max_keyword_features : int
+        Batas kosakata TF-IDF untuk ``overview`` dan ``keywords``.
+    stop_words : str atau list
+        Diteruskan ke ``TfidfVectorizer``.
+    """
+
+    def __init__(self, max_overview_features=5000, max_keyword_features=3000, stop_words='english'):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.max_features = {'overview': max_overview_features, 'keywords': max_keyword_features}
+        self.stop_words = stop_words
+        analyzer = TfidfVectorizer(stop_words=stop_words).build_analyzer()
+        self._counters = {name: _TermCounter(analyzer) for name in self.max_features}
+        self.titles, self.genres, self._popularity = [], [], []
+        self._metadata = {name: [] for name in METADATA_COLUMNS}
+
+    def partial_fit(self, batch):
+        """Tambahkan satu potongan ``movies_prep`` (DataFrame)."""
+        self.titles.extend(batch['title'])
+        self.genres.extend(batch['genres_list'])
+        self._popularity.append(batch['popularity'].to_numpy(dtype=np.float64))
+        for name, values in self._metadata.items():
+            values.append(batch[name].to_numpy(dtype=np.float64))
+        self._counters['overview'].partial_fit(batch['overview'])
+        self._counters['keywords'].partial_fit(_keyword_docs(batch))
+        return self
+
+    def _tfidf_vectorizer(self, name, vocabulary, idf):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        defaults = TfidfVectorizer(stop_words=self.stop_words, max_features=self.max_features[name]).get_params()
+        state = {'kind': 'tfidf', 'params': {p: defaults[p] for p in TFIDF_PARAMS}}
+        return vectorizer_from_state(state, vocabulary, idf)
+
+    def finalize(self):
+        """Gabungkan semua potongan menjadi ``RecommenderModel``.
+
+        Urutan blok fitur sama dengan notebook: genre, overview, keywords,
+        popularity. ``oov_baseline`` model diisi proporsi token korpus fit
+        yang berada di luar kosakata hasil pemangkasan.
+        """
+        classes = sorted({g for genres in self.genres for g in genres})
+        vectorizers = {'genres': vectorizer_from_state({'kind': 'multilabel', 'classes': classes})}
+        blocks = [sparse.csr_matrix(vectorizers['genres'].transform(self.genres))]
+        n_tokens, n_pruned = sum(len(genres) for genres in self.genres), 0
+        for name, counter in self._counters.items():
+            tfidf, vocabulary, idf = counter.finalize(self.max_features[name])
+            vectorizers[name] = self._tfidf_vectorizer(name, vocabulary, idf)
+            blocks.append(tfidf)
+            n_tokens += counter.n_tokens
+            n_pruned += counter.n_pruned
+        popularity = np.concatenate(self._popularity) if self._popularity else np.empty(0)
+        blocks.append(sparse.csr_matrix(popularity[:, np.newaxis]))
+        feature_mat = sparse.hstack(blocks, format='csr')
+        metadata = {name: np.concatenate(values) for name, values in self._metadata.items() if values}
+        return RecommenderModel(
+            feature_mat, self.titles, genres=self.genres, popularity=popularity, metadata=metadata,
+            vectorizers=vectorizers, oov_baseline=n_pruned / n_tokens if n_tokens else 0.0,
+        )
+
+
+def build_model_from_csv(path, chunksize=10000, **kwargs):
+    """Baca CSV TMDB secara streaming dan kembalikan ``RecommenderModel``."""
+    builder = StreamingFeatureBuilder(**kwargs)
+    for batch in iter_prepared_batches(path, chunksize):
+        builder.partial_fit(batch)
+    return builder.finalize()
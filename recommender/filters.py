@@ -0,0 +1,137 @@
+"""Pre-filter kandidat rekomendasi dengan indeks bitmap.
+
+Setiap genre (kolom ``genre_mat`` hasil ``MultiLabelBinarizer``) disimpan
+sebagai bitmap ter-*pack* (1 bit per film), dan setiap kolom metadata
+numerik (``year``, ``runtime``, ...) sebagai urutan ``argsort`` sehingga
+rentang nilai cukup dicari dengan ``searchsorted``. Filter digabung dengan
+operasi bitwise, lalu skor dan top-N hanya dihitung untuk film kandidat:
+semakin ketat filternya, semakin murah query-nya.
+
+Format filter (semua kunci opsional)::
+
+    {
+        'genres': ['Animation'],            # wajib memiliki semua genre ini
+        'any_genres': ['Action', 'Drama'],  # minimal salah satu genre ini
+        'exclude_genres': ['Horror'],       # tidak memiliki genre ini
+        'year': (2011, None),               # rentang inklusif, None = terbuka
+        'runtime': (None, 120),
+    }
+
+Nilai genre harus berupa list nama genre dan nilai rentang berupa list dua
+elemen (angka atau ``None``); format lain ditolak dengan ``ValueError``.
+"""
+import numbers
+
+import numpy as np
+from scipy import sparse
+
+GENRE_FILTERS = ('genres', 'any_genres', 'exclude_genres')
+
+
+def _check_filter(name, value):
+    # mis. {'genres': 'Drama'} akan diiterasi per karakter tanpa pemeriksaan ini
+    if name in GENRE_FILTERS:
+        if not isinstance(value, (list, tuple)) or not all(isinstance(g, str) for g in value):
+            raise ValueError(f'filter {name!r} harus berupa list nama genre')
+    elif not (
+        isinstance(value, (list, tuple)) and len(value) == 2
+        and all(v is None or (isinstance(v, numbers.Real) and not isinstance(v, bool)) for v in value)
+    ):
+        raise ValueError(f'filter {name!r} harus berupa rentang [min, max] (angka atau None)')
+
+
+class FilterIndex:
+    """Indeks bitmap genre dan indeks terurut metadata numerik.
+
+    Parameter
+    ---------
+    genre_mat : matriks biner (n_film x n_genre), mis. ``mlb.transform(...)``
+    genre_names : list nama genre sesuai kolom ``genre_mat``
+    numeric : dict ``nama -> array numerik per film`` (``NaN`` = tidak diketahui)
+    """
+
+    def __init__(self, genre_mat, genre_names, numeric=None):
+        genre_mat = sparse.csc_matrix(genre_mat)
+        self.n_items = genre_mat.shape[0]
+        self.genre_names = list(genre_names)
+        self._genre_col = {name: j for j, name in enumerate(self.genre_names)}
+        self._genre_bits = np.zeros((len(self.genre_names), (self.n_items + 7) // 8), dtype=np.uint8)
+        for j in range(len(self.genre_names)):
+            mask = np.zeros(self.n_items, dtype=bool)
+            mask[genre_mat.indices[genre_mat.indptr[j]:genre_mat.indptr[j + 1]]] = True
+            self._genre_bits[j] = np.packbits(mask)
+        # NaN diurutkan paling akhir dan tidak pernah masuk rentang mana pun
+        self._numeric = {}
+        for name, values in (numeric or {}).items():
+            values = np.asarray(values, dtype=np.float64)
+            order = np.argsort(values, kind='stable')
+            self._numeric[name] = (order, values[order])
+
+    @classmethod
+    def from_model(cls, model):
+        """Bangun indeks dari daftar genre dan ``metadata`` ``RecommenderModel``."""
+        names = sorted({g for genres in model.genres for g in genres})
+        col = {name: j for j, name in enumerate(names)}
+        cols = [col[g] for genres in model.genres for g in genres]
+        rows = np.repeat(np.arange(model.n_items), [len(genres) for genres in model.genres])
+        genre_mat = sparse.csc_matrix(
+            (np.ones(len(cols), dtype=np.int8), (rows, cols)), shape=(model.n_items, len(names)),
+        )
+        return cls(genre_mat, names, model.metadata)
+
+    def genre_matrix(self):
+        """Matriks boolean (n_film x n_genre), kolom sesuai ``genre_names``."""
+        return np.unpackbits(self._genre_bits, axis=1, count=self.n_items).T.astype(bool)
+
+    def _genre(self, name):
+        if name not in self._genre_col:
+            # genre yang tidak dikenal tidak dimiliki film mana pun
+            return np.zeros(self._genre_bits.shape[1], dtype=np.uint8)
+        return self._genre_bits[self._genre_col[name]]
+
+    def _range(self, name, bounds):
+        if name not in self._numeric:
+            raise ValueError(f'filter tidak dikenal: {name!r}')
+        order, sorted_values = self._numeric[name]
+        lo, hi = bounds
+        start = 0 if lo is None else np.searchsorted(sorted_values, lo, side='left')
+        # batas atas terbuka tetap mengecualikan NaN di ujung urutan
+        stop = np.searchsorted(sorted_values, np.inf if hi is None else hi, side='right')
+        mask = np.zeros(self.n_items, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def mask(self, filters):
+        """Bitmap ter-*pack* film yang lolos ``filters`` (``None`` = semua film)."""
+        if not filters:
+            return None
+        if not isinstance(filters, dict):
+            raise ValueError('filters harus berupa dict')
+        for name, value in filters.items():
+            _check_filter(name, value)
+        bits = None
+
+        def combine(current, other):
+            return other if current is None else current & other
+
+        for name in filters.get('genres', ()):
+            bits = combine(bits, self._genre(name))
+        if filters.get('any_genres'):
+            any_bits = np.bitwise_or.reduce([self._genre(name) for name in filters['any_genres']])
+            bits = combine(bits, any_bits)
+        for name in filters.get('exclude_genres', ()):
+            bits = combine(bits, ~self._genre(name))
+        for name, bounds in filters.items():
+            if name not in GENRE_FILTERS:
+                bits = combine(bits, self._range(name, bounds))
+        return bits
+
+    def candidates(self, filters):
+        """Indeks baris (terurut) film yang lolos ``filters``.
+
+        Mengembalikan ``None`` jika tidak ada filter (seluruh katalog).
+        """
+        bits = self.mask(filters)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_items))
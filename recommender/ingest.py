@@ -0,0 +1,55 @@
+"""Pembacaan CSV TMDB secara streaming dalam satu kali lintasan.
+
+Hanya kolom yang dipakai sistem rekomendasi yang dibaca, CSV diproses per
+potongan (``chunksize`` baris), dan kolom JSON ``genres``/``keywords``
+di-parse tepat satu kali per baris. Parser ``orjson`` dipakai bila
+terpasang, selain itu ``json`` bawaan.
+"""
+import pandas as pd
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - orjson opsional
+    from json import loads as _json_loads
+
+# kolom CSV yang dibaca dan nama kolom hasil persiapan
+CSV_COLUMNS = ['title', 'genres', 'keywords', 'overview', 'popularity', 'release_date', 'runtime']
+PREPARED_COLUMNS = ['title', 'genres_list', 'keywords_list', 'overview', 'popularity', 'year', 'runtime']
+# kolom numerik yang ikut disimpan di model sebagai metadata per film
+METADATA_COLUMNS = ['year', 'runtime']
+
+
+def parse_names(value):
+    """``'[{"id": 28, "name": "Action"}, ...]'`` -> ``['Action', ...]``."""
+    if not isinstance(value, str) or not value:
+        return []
+    return [d['name'] for d in _json_loads(value)]
+
+
+def prepare_batch(chunk):
+    """Ubah satu potongan CSV mentah menjadi format ``movies_prep``."""
+    return pd.DataFrame({
+        'title': chunk['title'].to_numpy(),
+        'genres_list': [parse_names(v) for v in chunk['genres'].to_numpy()],
+        'keywords_list': [parse_names(v) for v in chunk['keywords'].to_numpy()],
+        'overview': chunk['overview'].fillna('').to_numpy(),
+        'popularity': chunk['popularity'].to_numpy(dtype=float),
+        'year': pd.to_datetime(chunk['release_date'], format='%Y-%m-%d', errors='coerce').dt.year.to_numpy(dtype=float),
+        'runtime': pd.to_numeric(chunk['runtime'], errors='coerce').to_numpy(dtype=float),
+    }, index=chunk.index)
+
+
+def iter_prepared_batches(path, chunksize=10000):
+    """Hasilkan potongan ``movies_prep`` dari CSV TMDB satu per satu.
+
+    Index setiap potongan melanjutkan nomor baris di file, sehingga hasil
+    gabungannya sama dengan membaca seluruh CSV sekaligus.
+    """
+    reader = pd.read_csv(path, usecols=CSV_COLUMNS, chunksize=chunksize)
+    for chunk in reader:
+        yield prepare_batch(chunk)
+
+
+def load_prepared(path, chunksize=10000):
+    """Baca seluruh CSV menjadi satu DataFrame ``movies_prep``."""
+    return pd.concat(iter_prepared_batches(path, chunksize), ignore_index=True)
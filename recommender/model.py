@@ -0,0 +1,407 @@
+"""Model rekomendasi siap pakai yang bisa disimpan dan dimuat ulang."""
+import numpy as np
+
+from .filters import FilterIndex
+from .ranking import MMR_POOL_FACTOR, mmr_rerank, select_top_n
+from .similarity import SimilarityEngine
+from .titles import TitleIndex
+
+# kenaikan proporsi token (dan genre) di luar kosakata, dihitung sejak fit
+# terakhir dan di atas ``oov_baseline``, yang dianggap cukup besar untuk fit
+# ulang vectorizer secara penuh (``RecommenderModel.refit``)
+DRIFT_THRESHOLD = 0.2
+
+
+class RecommenderModel:
+    """Gabungan semua komponen yang dibutuhkan untuk menjawab query.
+
+    Parameter
+    ---------
+    feature_mat : matriks sparse (n_film x n_fitur)
+    titles : list judul film, urut sesuai baris ``feature_mat``
+    genres : list daftar genre per film, opsional
+    popularity : array ``popularity`` mentah per film, opsional
+        Dibutuhkan oleh ``build_embedding`` karena ``feature_mat`` tersimpan
+        dalam bentuk ternormalisasi.
+    metadata : dict ``nama -> array numerik per film`` (mis. ``year``), opsional
+        Nilai yang tidak diketahui diisi ``NaN``.
+    vectorizers : dict ``nama -> vectorizer hasil fit`` (``genres``,
+        ``overview``, ``keywords``), atau fungsi tanpa argumen yang
+        mengembalikan dict tersebut (dipanggil saat pertama dibutuhkan)
+    neighbor_index : ``NeighborIndex``, opsional
+    ann_index : ``IVFIndex``, opsional
+        Dipakai oleh ``recommend(..., mode='approx')``.
+    embedding : ``EmbeddingEngine``, opsional
+        Dipakai oleh ``recommend(..., mode='embedding')``.
+    assume_normalized : bool
+        ``True`` jika baris ``feature_mat`` sudah ber-norma L2.
+    oov_baseline : float
+        Proporsi token korpus fit yang berada di luar kosakata karena dipangkas
+        ``max_features`` (diisi ``StreamingFeatureBuilder``); ``drift`` diukur
+        relatif terhadap nilai ini.
+    """
+
+    def __init__(self, feature_mat, titles, genres=None, popularity=None, metadata=None, vectorizers=None,
+                 neighbor_index=None, ann_index=None, embedding=None, assume_normalized=False,
+                 oov_baseline=0.0):
+        self.engine = SimilarityEngine(feature_mat, assume_normalized=assume_normalized)
+        self.titles = list(titles)
+        self.genres = list(genres) if genres is not None else [[] for _ in self.titles]
+        self.popularity = np.asarray(popularity, dtype=np.float64) if popularity is not None else None
+        self.metadata = {name: np.asarray(values, dtype=np.float64) for name, values in (metadata or {}).items()}
+        self._vectorizers = vectorizers if vectorizers is not None else {}
+        self.neighbor_index = neighbor_index
+        self.ann_index = ann_index
+        self.embedding = embedding
+        self._title_index = None
+        self._filter_index = None
+        self.oov_baseline = float(oov_baseline)
+        self._drift_tokens = 0
+        self._drift_unknown = 0
+        # asal setiap baris untuk ``refit``: nomor baris CSV fit (>= 0), atau
+        # ``-1 - i`` untuk film ke-i di ``_added`` (record ``movies_prep``)
+        self._origin = np.arange(len(self.titles), dtype=np.int64)
+        self._added = []
+
+    @property
+    def n_items(self):
+        return self.engine.n_items
+
+    @property
+    def vectorizers(self):
+        if callable(self._vectorizers):
+            self._vectorizers = self._vectorizers()
+        return self._vectorizers
+
+    def vectorizer_states(self):
+        from .artifacts import vectorizer_state
+
+        return {name: vectorizer_state(vec) for name, vec in self.vectorizers.items()}
+
+    @property
+    def title_index(self):
+        """``TitleIndex`` atas judul (dan tahun) katalog, dibangun saat dibutuhkan."""
+        if self._title_index is None:
+            self._title_index = TitleIndex(self.titles, years=self.metadata.get('year'))
+        return self._title_index
+
+    def index_of(self, title):
+        """Indeks baris untuk ``title``.
+
+        Judul dinormalisasi dan boleh diberi tahun (``"Avatar (2009)"``) untuk
+        memilih di antara film berjudul sama; tanpa tahun dipilih film pertama.
+        """
+        return self.title_index.resolve(title)
+
+    def _resolve(self, item):
+        return self.index_of(item) if isinstance(item, str) else int(item)
+
+    def search_titles(self, query, limit=10, mode='complete'):
+        """Cari judul untuk kotak pencarian sebagai list dict biasa.
+
+        ``mode`` adalah ``'prefix'``, ``'fuzzy'``, atau ``'complete'``
+        (prefix dilengkapi fuzzy).
+        """
+        if mode == 'fuzzy':
+            ids = [i for i, _ in self.title_index.fuzzy(query, limit)]
+        elif mode in ('prefix', 'complete'):
+            ids = getattr(self.title_index, mode)(query, limit)
+        else:
+            raise ValueError(f"mode tidak dikenal: {mode!r}")
+        return [{'idx': int(i), 'title': self.titles[i], 'label': self.title_index.label(i)} for i in ids]
+
+    @property
+    def filter_index(self):
+        """``FilterIndex`` atas genre dan ``metadata``, dibangun saat dibutuhkan."""
+        if self._filter_index is None:
+            self._filter_index = FilterIndex.from_model(self)
+        return self._filter_index
+
+    def _check_mode(self, mode, modes=('exact', 'approx', 'embedding')):
+        if mode not in modes:
+            raise ValueError(f"mode tidak dikenal: {mode!r}")
+        if mode == 'approx' and self.ann_index is None:
+            raise ValueError("mode='approx' membutuhkan ann_index")
+        if mode == 'embedding' and self.embedding is None:
+            raise ValueError("mode='embedding' membutuhkan embedding")
+        return self.embedding if mode == 'embedding' else self.engine
+
+    def _select(self, engine, query, top_n, exclude, filters=None):
+        """Top-N untuk vektor ``query``, dibatasi kandidat ``filters`` bila ada."""
+        cand = self.filter_index.candidates(filters) if filters else None
+        if cand is None:
+            return select_top_n(engine.query_scores(query), top_n, exclude=exclude)
+        if cand.size * 4 > self.n_items:
+            # kandidat banyak: satu matvec penuh lebih murah daripada mengambil baris kandidat
+            scores = engine.query_scores(query)[cand]
+        else:
+            scores = engine.query_scores(query, cand)
+        pos, scores = select_top_n(scores, top_n, exclude=np.flatnonzero(np.isin(cand, exclude)))
+        return cand[pos], scores
+
+    def _pool_size(self, top_n, diversity):
+        """Jumlah kandidat yang diambil sebelum re-ranking MMR."""
+        if not 0 <= diversity <= 1:
+            raise ValueError('diversity harus di antara 0 dan 1')
+        return top_n * MMR_POOL_FACTOR if diversity else top_n
+
+    def _diversify(self, engine, rec_idx, scores, top_n, diversity):
+        if not diversity or len(rec_idx) <= 1:
+            return rec_idx, scores
+        return mmr_rerank(engine, rec_idx, scores, top_n, diversity)
+
+    def _records(self, rec_idx, scores):
+        return [
+            {'idx': int(i), 'title': self.titles[i], 'genres': list(self.genres[i]), 'score': float(s)}
+            for i, s in zip(np.asarray(rec_idx), np.asarray(scores))
+        ]
+
+    def recommend(self, title, top_n=10, mode='exact', n_probe=None, filters=None, diversity=0.0):
+        """Top-N film termirip dengan ``title`` (judul atau indeks baris)
+        sebagai list dict biasa.
+
+        ``mode='exact'`` memakai indeks tetangga jika tersedia dan cukup
+        panjang, selain itu menghitung skor on-demand dari ``feature_mat``.
+        ``mode='approx'`` memakai ``ann_index`` dengan ``n_probe`` daftar.
+        ``mode='embedding'`` memakai embedding dense float32 (``embedding``).
+
+        ``filters`` (lihat ``recommender.filters``) membatasi hasil pada film
+        yang lolos filter genre/metadata. Skor dan top-N hanya dihitung untuk
+        kandidat tersebut, secara eksak (``mode='approx'`` tidak dipakai).
+
+        ``diversity`` (0..1) mengaktifkan re-ranking MMR: ``MMR_POOL_FACTOR *
+        top_n`` kandidat teratas disusun ulang agar film yang terlalu mirip
+        satu sama lain tidak memenuhi daftar. ``0`` = urutan relevansi biasa.
+        """
+        engine = self._check_mode(mode)
+        idx = self._resolve(title)
+        pool = self._pool_size(top_n, diversity)
+        if filters:
+            rec_idx, scores = self._select(engine, engine.query_vector(idx), pool, idx, filters)
+        elif mode == 'approx':
+            rec_idx, scores = self.ann_index.search(self.engine, idx, pool, n_probe)
+        elif mode == 'exact' and self.neighbor_index is not None and pool <= self.neighbor_index.k:
+            rec_idx, scores = self.neighbor_index.neighbors(idx, pool)
+        else:
+            rec_idx, scores = select_top_n(engine.scores(idx), pool, exclude=idx)
+        rec_idx, scores = self._diversify(engine, rec_idx, scores, top_n, diversity)
+        return self._records(rec_idx, scores)
+
+    def recommend_batch(self, titles, top_n=10, chunk_size=256):
+        """Top-N untuk banyak film sekaligus dalam format long.
+
+        Memakai ``neighbor_index`` bila cukup panjang, selain itu
+        ``engine.top_n_batch``: satu perkalian sparse matrix-matrix dan seleksi
+        top-N tervektorisasi per potongan ``chunk_size`` film. Film query
+        selalu dikecualikan.
+
+        Returns
+        -------
+        dict berisi array sepanjang ``len(titles) * top_n``: ``seed`` (indeks
+        film query), ``rank`` (mulai 1), ``rec_idx``, dan ``score``
+        """
+        seeds = np.array([self._resolve(t) for t in titles], dtype=np.intp)
+        if self.neighbor_index is not None and top_n <= self.neighbor_index.k:
+            indices, scores = self.neighbor_index._as_arrays()
+            rec_idx, scores = indices[seeds, :top_n], scores[seeds, :top_n]
+        else:
+            rec_idx, scores = self.engine.top_n_batch(seeds, top_n, chunk_size)
+        n_seeds, k = rec_idx.shape
+        return {
+            'seed': np.repeat(seeds, k),
+            'rank': np.tile(np.arange(1, k + 1), n_seeds),
+            'rec_idx': rec_idx.ravel(),
+            'score': scores.ravel(),
+        }
+
+    def recommend_profile(self, liked, top_n=10, weights=None, disliked=(), dislike_weight=1.0,
+                          mode='exact', filters=None, diversity=0.0):
+        """Top-N film untuk profil pengguna berisi beberapa film favorit.
+
+        ``liked`` dan ``disliked`` berisi judul atau indeks baris. Baris
+        ``feature_mat`` film yang disukai dijumlahkan dengan ``weights``
+        (default 1 untuk semua), film di ``disliked`` dikurangkan dengan bobot
+        ``dislike_weight``, lalu katalog diberi skor terhadap satu vektor
+        query gabungan tersebut dalam satu perkalian. Semua film seed
+        dikecualikan dari hasil. ``mode`` adalah ``'exact'`` atau
+        ``'embedding'``; ``filters`` dan ``diversity`` sama seperti pada
+        ``recommend``.
+
+        Raises
+        ------
+        ValueError : jika ``liked`` kosong atau vektor profil bernorma 0
+            (mis. semua ``weights`` 0, atau ``liked`` sama dengan ``disliked``)
+        """
+        engine = self._check_mode(mode, modes=('exact', 'embedding'))
+        if not len(liked):
+            raise ValueError('liked harus berisi minimal satu film')
+        liked_idx = [self._resolve(t) for t in liked]
+        disliked_idx = [self._resolve(t) for t in disliked]
+        if weights is None:
+            weights = np.ones(len(liked_idx))
+        elif len(weights) != len(liked_idx):
+            raise ValueError('panjang weights harus sama dengan jumlah film yang disukai')
+        seeds = np.array(liked_idx + disliked_idx, dtype=np.intp)
+        coef = np.concatenate([np.asarray(weights, dtype=np.float64), np.full(len(disliked_idx), -dislike_weight)])
+        query = engine.profile_vector(seeds, coef)
+        rec_idx, scores = self._select(engine, query, self._pool_size(top_n, diversity), np.unique(seeds), filters)
+        rec_idx, scores = self._diversify(engine, rec_idx, scores, top_n, diversity)
+        return self._records(rec_idx, scores)
+
+    @property
+    def drift(self):
+        """Kenaikan proporsi token film tambahan di luar kosakata hasil fit.
+
+        Korpus fit sendiri sudah memiliki ``oov_baseline`` token di luar
+        kosakata (term yang terpangkas ``max_features``); hanya kelebihan di
+        atas nilai itu yang dihitung sebagai drift.
+        """
+        if not self._drift_tokens:
+            return 0.0
+        return max(self._drift_unknown / self._drift_tokens - self.oov_baseline, 0.0)
+
+    def add_movies(self, batch, drift_threshold=DRIFT_THRESHOLD, chunk_size=256):
+        """Tambahkan film baru tanpa fit ulang vectorizer.
+
+        ``batch`` adalah DataFrame berformat ``movies_prep`` (lihat
+        ``ingest.prepare_batch``). Baris baru di-transform dengan kosakata
+        yang dibekukan lalu ditambahkan ke ``feature_mat``; pada indeks
+        tetangga hanya daftar yang terpengaruh film baru yang diperbarui.
+
+        Returns
+        -------
+        bool : ``True`` jika ``drift`` melewati ``drift_threshold`` sehingga
+            model sebaiknya dibangun ulang penuh dengan ``refit``. Film yang
+            ditambahkan lewat metode ini disimpan sebagai record
+            ``movies_prep`` (juga di artefak) agar ikut di-fit ulang;
+            ``build_model_from_csv`` saja akan kehilangan film tersebut.
+        """
+        import json
+
+        from .features import transform_batch, vocabulary_coverage
+        from .ingest import PREPARED_COLUMNS
+
+        rows = transform_batch(self.vectorizers, batch)
+        n_tokens, n_unknown = vocabulary_coverage(self.vectorizers, batch)
+        self._drift_tokens += n_tokens
+        self._drift_unknown += n_unknown
+        start = self.n_items
+        self.engine.append_rows(rows)
+        first = len(self._added)
+        self._added.extend(json.loads(batch[[c for c in PREPARED_COLUMNS if c in batch]].to_json(orient='records')))
+        self._origin = np.concatenate([self._origin, -1 - np.arange(first, len(self._added))])
+        self.titles.extend(batch['title'])
+        self.genres.extend(list(g) for g in batch['genres_list'])
+        if self.popularity is not None:
+            self.popularity = np.concatenate([self.popularity, batch['popularity'].to_numpy(dtype=np.float64)])
+        for name, values in self.metadata.items():
+            new_values = batch[name].to_numpy(dtype=np.float64) if name in batch else np.full(len(batch), np.nan)
+            self.metadata[name] = np.concatenate([values, new_values])
+        self._title_index = None
+        self._filter_index = None
+        if self.neighbor_index is not None:
+            self.neighbor_index.add_items(self.engine, start, chunk_size)
+        if self.ann_index is not None:
+            self.ann_index.add_items(self.engine, start)
+        if self.embedding is not None:
+            self.embedding.append_rows(rows)
+        return self.drift > drift_threshold
+
+    def remove_movies(self, items, chunk_size=256):
+        """Hapus film berdasarkan judul atau indeks baris.
+
+        Indeks baris film yang tersisa bergeser mengikuti penghapusan. Hanya
+        film yang kehilangan tetangga yang dihitung ulang daftar tetangganya.
+        """
+        drop = [self._resolve(item) for item in items]
+        keep = np.ones(self.n_items, dtype=bool)
+        keep[drop] = False
+        self.engine.select_rows(keep)
+        self._origin = self._origin[keep]
+        self.titles = [t for t, k in zip(self.titles, keep) if k]
+        self.genres = [g for g, k in zip(self.genres, keep) if k]
+        if self.popularity is not None:
+            self.popularity = self.popularity[keep]
+        self.metadata = {name: values[keep] for name, values in self.metadata.items()}
+        self._title_index = None
+        self._filter_index = None
+        if self.neighbor_index is not None:
+            self.neighbor_index.remove_items(self.engine, keep, chunk_size)
+        if self.ann_index is not None:
+            self.ann_index.remove_items(keep)
+        if self.embedding is not None:
+            self.embedding.select_rows(keep)
+
+    def refit(self, csv_path, chunksize=10000, n_jobs=1, **kwargs):
+        """Fit ulang penuh dari ``csv_path`` beserta film dari ``add_movies``.
+
+        Vectorizer di-fit ulang pada baris CSV yang masih ada di katalog (film
+        yang dihapus dengan ``remove_movies`` tetap dilewati) ditambah film
+        yang ditambahkan sejak fit, dengan urutan baris yang sama seperti model
+        ini. ``csv_path`` harus CSV yang sama dengan yang dipakai saat fit.
+        Parameter vectorizer diambil dari model ini dan bisa diganti lewat
+        ``kwargs`` (diteruskan ke ``StreamingFeatureBuilder``). Indeks
+        tetangga, ANN, dan embedding yang dimiliki model ini dibangun ulang
+        dengan parameter yang sama.
+
+        Returns
+        -------
+        ``RecommenderModel`` baru dengan ``drift`` 0
+        """
+        import pandas as pd
+
+        from .features import StreamingFeatureBuilder
+        from .ingest import PREPARED_COLUMNS, iter_prepared_batches
+
+        overview, keywords = self.vectorizers['overview'], self.vectorizers['keywords']
+        params = {
+            'max_overview_features': overview.max_features,
+            'max_keyword_features': keywords.max_features,
+            'stop_words': overview.stop_words,
+        }
+        builder = StreamingFeatureBuilder(**dict(params, **kwargs))
+        fit_rows = self._origin[self._origin >= 0]
+        n_found = 0
+        for batch in iter_prepared_batches(csv_path, chunksize):
+            batch = batch[batch.index.isin(fit_rows)]
+            n_found += len(batch)
+            builder.partial_fit(batch)
+        if n_found != fit_rows.size:
+            raise ValueError(f'{csv_path} hanya berisi {n_found} dari {fit_rows.size} baris fit model ini')
+        added = [self._added[-1 - o] for o in self._origin[self._origin < 0]]
+        if added:
+            frame = pd.DataFrame.from_records(added, columns=PREPARED_COLUMNS)
+            frame['overview'] = frame['overview'].fillna('')
+            frame['keywords_list'] = [k if isinstance(k, list) else [] for k in frame['keywords_list']]
+            builder.partial_fit(frame)
+        model = builder.finalize()
+        model._origin = np.concatenate([fit_rows, -1 - np.arange(len(added))])
+        model._added = added
+        if self.neighbor_index is not None:
+            from .neighbors import build_neighbor_index
+
+            model.neighbor_index = build_neighbor_index(
+                model.engine.feature_mat, k=self.neighbor_index.k, assume_normalized=True, n_jobs=n_jobs,
+            )
+        if self.ann_index is not None:
+            from .ann import IVFIndex
+
+            model.ann_index = IVFIndex.build(model.engine.feature_mat, n_probe=self.ann_index.n_probe)
+        if self.embedding is not None:
+            from .embedding import build_embedding
+
+            model.embedding = build_embedding(
+                model, n_components=self.embedding.n_components, weights=self.embedding.weights,
+            )
+        return model
+
+    def save(self, path):
+        from .artifacts import save_artifacts
+
+        save_artifacts(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        from .artifacts import load_artifacts
+
+        return load_artifacts(path, mmap=mmap)
@@ -0,0 +1,213 @@
+"""Indeks tetangga top-K yang disimpan sebagai graf sparse CSR.
+
+Sebagian besar permintaan berbentuk "film yang mirip dengan X". Daripada
+menghitung dan mengurutkan ulang skor seluruh katalog pada setiap panggilan,
+``build_neighbor_index`` menghitung K tetangga terbaik untuk setiap film satu
+kali (per blok baris, tanpa matriks n x n), lalu hasilnya disimpan ke file
+``.npz``. Di sisi serving, ``NeighborIndex.neighbors`` hanya memotong satu
+baris CSR sehingga biayanya O(K).
+
+Dengan ``n_jobs > 1`` baris query dibagi ke beberapa proses. Array CSR
+dibagikan lewat file ``.npy`` yang di-mmap (bukan salinan hasil pickle),
+dan setiap worker menulis hasil top-K bloknya langsung ke array keluaran
+yang juga di-mmap, sehingga matriks n x n tidak pernah dikumpulkan.
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from .ranking import topk_rows
+from .similarity import SimilarityEngine
+
+
+class NeighborIndex:
+    """Graf tetangga top-K: baris ``i`` berisi K film termirip dengan film ``i``.
+
+    Entri di setiap baris disimpan terurut berdasarkan skor menurun.
+    """
+
+    def __init__(self, graph):
+        self.graph = sparse.csr_matrix(graph)
+
+    @property
+    def n_items(self):
+        return self.graph.shape[0]
+
+    @property
+    def k(self):
+        return int(np.diff(self.graph.indptr).max()) if self.n_items else 0
+
+    def neighbors(self, idx, top_n=None):
+        """Kembalikan ``(indices, scores)`` tetangga film ``idx`` dalam O(K)."""
+        start, stop = self.graph.indptr[idx], self.graph.indptr[idx + 1]
+        if top_n is not None:
+            stop = min(stop, start + top_n)
+        return self.graph.indices[start:stop], self.graph.data[start:stop]
+
+    def _as_arrays(self):
+        """Tampilan ``(indices, scores)`` berukuran (n, K) dari graf."""
+        k = self.k
+        return self.graph.indices.reshape(-1, k), self.graph.data.reshape(-1, k)
+
+    def _set_arrays(self, indices, scores):
+        n, k = indices.shape
+        indptr = np.arange(n + 1, dtype=np.int64) * k
+        self.graph = sparse.csr_matrix(
+            (scores.ravel(), indices.astype(np.int32, copy=False).ravel(), indptr), shape=(n, n)
+        )
+
+    def add_items(self, engine, start, chunk_size=256):
+        """Perbarui indeks setelah baris ``start`` dst. ditambahkan ke ``engine``.
+
+        Film baru mendapat daftar tetangga lengkap. Untuk film lama, hanya
+        baris yang skor terhadap salah satu film baru melebihi skor tetangga
+        ke-K-nya yang digabung ulang; sisanya tidak disentuh.
+
+        Returns
+        -------
+        int : jumlah film lama yang daftar tetangganya berubah
+        """
+        k = self.k
+        new_ids = np.arange(start, engine.n_items)
+        new_indices, new_scores = engine.top_n_batch(new_ids, k, chunk_size)
+        old_indices, old_scores = (a.copy() for a in self._as_arrays())
+        changed = np.zeros(start, dtype=bool)
+        for c in range(0, new_ids.size, chunk_size):
+            chunk = new_ids[c:c + chunk_size]
+            candidates = engine.batch_scores(chunk)[:, :start].T
+            # id film baru selalu lebih besar, jadi skor sama tidak menggeser tetangga lama
+            affected = np.flatnonzero((candidates > old_scores[:, -1:]).any(axis=1))
+            if affected.size == 0:
+                continue
+            merged_scores = np.hstack([old_scores[affected], candidates[affected]])
+            merged_indices = np.hstack([
+                old_indices[affected], np.broadcast_to(chunk, (affected.size, chunk.size)),
+            ])
+            pos, old_scores[affected] = topk_rows(merged_scores, k)
+            old_indices[affected] = np.take_along_axis(merged_indices, pos, axis=1)
+            changed[affected] = True
+        self._set_arrays(np.vstack([old_indices, new_indices]), np.vstack([old_scores, new_scores]))
+        return int(changed.sum())
+
+    def remove_items(self, engine, keep, chunk_size=256):
+        """Perbarui indeks setelah ``engine`` hanya menyimpan baris ``keep``.
+
+        Id tetangga dipetakan ulang; hanya film yang kehilangan tetangga
+        (karena tetangganya dihapus) yang dihitung ulang dari ``engine``.
+
+        Returns
+        -------
+        int : jumlah film yang daftar tetangganya dihitung ulang
+        """
+        keep = np.asarray(keep, dtype=bool)
+        k = min(self.k, engine.n_items - 1)
+        old_indices, old_scores = self._as_arrays()
+        remap = np.full(keep.size, -1, dtype=np.int64)
+        remap[keep] = np.arange(keep.sum())
+        indices = remap[old_indices[keep, :k]]
+        scores = np.array(old_scores[keep, :k])
+        affected = np.flatnonzero((indices < 0).any(axis=1))
+        if affected.size:
+            indices[affected], scores[affected] = engine.top_n_batch(affected, k, chunk_size)
+        self._set_arrays(indices, scores)
+        return int(affected.size)
+
+    def save(self, path):
+        sparse.save_npz(path, self.graph, compressed=False)
+
+    @classmethod
+    def load(cls, path):
+        return cls(sparse.load_npz(path))
+
+
+def build_neighbor_index(feature_mat, k=50, block_size=256, assume_normalized=False, n_jobs=1):
+    """Bangun ``NeighborIndex`` berisi ``k`` tetangga terbaik untuk setiap film.
+
+    Similarity dihitung per blok ``block_size`` baris dengan perkalian matriks
+    sparse, sehingga memori puncak kira-kira ``n * block_size`` float, bukan
+    ``n * n``. Film itu sendiri tidak pernah masuk ke daftar tetangganya.
+
+    Parameter
+    ---------
+    feature_mat : matriks sparse (n_film x n_fitur)
+    k : int
+        Jumlah tetangga yang disimpan per film.
+    block_size : int
+        Jumlah baris query yang diproses dalam satu blok.
+    assume_normalized : bool
+        Lewati normalisasi jika ``feature_mat`` sudah ber-norma L2 per baris
+        (misalnya ``SimilarityEngine.feature_mat``).
+    n_jobs : int
+        Jumlah proses worker; ``-1`` berarti semua core.
+    """
+    engine = SimilarityEngine(feature_mat, assume_normalized=assume_normalized)
+    n = engine.n_items
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs > 1 and n > block_size:
+        indices, scores = _parallel_top_n(engine, min(k, n - 1), block_size, n_jobs)
+    else:
+        indices, scores = engine.top_n_batch(np.arange(n), k, chunk_size=block_size)
+    k = indices.shape[1]
+    indptr = np.arange(n + 1, dtype=np.int64) * k
+    graph = sparse.csr_matrix((scores.ravel(), indices.ravel(), indptr), shape=(n, n))
+    return NeighborIndex(graph)
+
+
+# state per proses worker, diisi oleh _init_worker
+_worker = {}
+
+
+def _load_shared(directory, name, mode='r'):
+    return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode)
+
+
+def _shared_csr(directory, prefix, shape):
+    return sparse.csr_matrix(
+        tuple(_load_shared(directory, f'{prefix}_{part}') for part in ('data', 'indices', 'indptr')),
+        shape=shape, copy=False,
+    )
+
+
+def _init_worker(directory, shapes):
+    engine = SimilarityEngine(_shared_csr(directory, 'feature', shapes['feature']), assume_normalized=True)
+    engine._column_split = (
+        _load_shared(directory, 'dense'),
+        _shared_csr(directory, 'sparse', shapes['sparse']),
+        _shared_csr(directory, 'sparse_t', shapes['sparse_t']),
+    )
+    _worker['engine'] = engine
+    _worker['indices'] = _load_shared(directory, 'out_indices', 'r+')
+    _worker['scores'] = _load_shared(directory, 'out_scores', 'r+')
+
+
+def _top_n_rows(start, stop, k, chunk_size):
+    indices, scores = _worker['engine'].top_n_batch(np.arange(start, stop), k, chunk_size)
+    _worker['indices'][start:stop] = indices
+    _worker['scores'][start:stop] = scores
+
+
+def _parallel_top_n(engine, k, block_size, n_jobs):
+    """``engine.top_n_batch`` untuk seluruh katalog, dibagi ke ``n_jobs`` proses."""
+    n = engine.n_items
+    dense, sparse_part, sparse_part_t = engine._split_columns()
+    with tempfile.TemporaryDirectory(prefix='neighbors-') as directory:
+        arrays = {'dense': dense}
+        for prefix, mat in (('feature', engine.feature_mat), ('sparse', sparse_part), ('sparse_t', sparse_part_t)):
+            for part in ('data', 'indices', 'indptr'):
+                arrays[f'{prefix}_{part}'] = getattr(mat, part)
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f'{name}.npy'), array)
+        for name, dtype in (('out_indices', np.int32), ('out_scores', np.float64)):
+            np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+', dtype=dtype, shape=(n, k)).flush()
+        shapes = {'feature': engine.feature_mat.shape, 'sparse': sparse_part.shape, 'sparse_t': sparse_part_t.shape}
+        starts = range(0, n, block_size)
+        with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(directory, shapes)) as pool:
+            list(pool.map(
+                _top_n_rows, starts, [min(s + block_size, n) for s in starts],
+                [k] * len(starts), [block_size] * len(starts),
+            ))
+        return np.array(_load_shared(directory, 'out_indices')), np.array(_load_shared(directory, 'out_scores'))
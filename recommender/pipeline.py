@@ -0,0 +1,147 @@
+"""Titik masuk headless untuk build, load, dan query model rekomendasi.
+
+Worker yang hanya menjawab query cukup memuat artefak dengan
+``load_model`` (``numpy`` + ``scipy``, array di-*memory-map*); ``pandas`` dan
+scikit-learn baru diimpor oleh ``build_artifacts`` atau ketika vectorizer
+dibutuhkan untuk ``add_movies``. Tidak ada plot atau EDA yang dijalankan.
+
+Dari command line::
+
+    python -m recommender build tmdb_5000_movies.csv model_artifacts --ann --embedding 128
+    python -m recommender query model_artifacts "Avatar" --top-n 10
+    python -m recommender serve model_artifacts --port 8000
+"""
+import argparse
+import json
+import time
+
+from .model import RecommenderModel
+
+
+def build_artifacts(csv_path, path, chunksize=10000, neighbors=50, ann=False, embedding=0, n_jobs=1):
+    """Bangun model dari CSV TMDB lalu simpan artefaknya ke ``path``.
+
+    Parameter
+    ---------
+    neighbors : int
+        Jumlah tetangga per film di ``NeighborIndex`` (0 = tanpa indeks).
+    ann : bool
+        Bangun juga ``IVFIndex`` untuk ``mode='approx'``.
+    embedding : int
+        Dimensi ``EmbeddingEngine`` untuk ``mode='embedding'`` (0 = tanpa).
+    n_jobs : int
+        Jumlah proses untuk ``build_neighbor_index`` (-1 = semua core).
+
+    Returns
+    -------
+    ``RecommenderModel`` yang baru dibangun
+    """
+    from .features import build_model_from_csv
+
+    model = build_model_from_csv(csv_path, chunksize)
+    if neighbors:
+        from .neighbors import build_neighbor_index
+
+        model.neighbor_index = build_neighbor_index(
+            model.engine.feature_mat, k=neighbors, assume_normalized=True, n_jobs=n_jobs,
+        )
+    if ann:
+        from .ann import IVFIndex
+
+        model.ann_index = IVFIndex.build(model.engine.feature_mat)
+    if embedding:
+        from .embedding import build_embedding
+
+        model.embedding = build_embedding(model, n_components=embedding)
+    model.save(path)
+    return model
+
+
+def load_model(path, mmap=True):
+    """Muat ``RecommenderModel`` dari direktori artefak (tanpa scikit-learn)."""
+    return RecommenderModel.load(path, mmap=mmap)
+
+
+def query(model, titles, top_n=10, mode='exact', filters=None, diversity=0.0):
+    """Rekomendasi untuk satu atau beberapa judul.
+
+    ``model`` boleh berupa ``RecommenderModel`` atau path direktori artefak.
+    Mengembalikan list dict (satu judul) atau dict ``judul -> list dict``.
+    Beberapa judul dengan ``mode='exact'`` tanpa filter/diversity dijawab
+    sekaligus dengan ``recommend_batch``.
+    """
+    if not isinstance(model, RecommenderModel):
+        model = load_model(model)
+    if isinstance(titles, (str, int)):
+        return model.recommend(titles, top_n, mode=mode, filters=filters, diversity=diversity)
+    titles = list(titles)
+    if not titles:
+        return {}
+    if mode != 'exact' or filters or diversity:
+        return {title: model.recommend(title, top_n, mode=mode, filters=filters, diversity=diversity)
+                for title in titles}
+    batch = model.recommend_batch(titles, top_n)
+    rec_idx = batch['rec_idx'].reshape(len(titles), -1)
+    scores = batch['score'].reshape(len(titles), -1)
+    return {title: model._records(rec_idx[i], scores[i]) for i, title in enumerate(titles)}
+
+
+def _print_records(title, records):
+    print(f'Rekomendasi untuk {title!r}:')
+    for rank, rec in enumerate(records, 1):
+        print(f"{rank:>3}. {rec['title']}  [{', '.join(rec['genres'])}]  {rec['score']:.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m recommender', description='Sistem rekomendasi film (headless)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='bangun model dari CSV TMDB dan simpan artefaknya')
+    build.add_argument('csv', help='path tmdb_5000_movies.csv')
+    build.add_argument('artifacts', help='direktori keluaran artefak')
+    build.add_argument('--chunksize', type=int, default=10000)
+    build.add_argument('--neighbors', type=int, default=50, help='k NeighborIndex (0 = tanpa)')
+    build.add_argument('--ann', action='store_true', help='bangun IVFIndex')
+    build.add_argument('--embedding', type=int, default=0, help='dimensi embedding (0 = tanpa)')
+    build.add_argument('--n-jobs', type=int, default=1)
+
+    query_cmd = commands.add_parser('query', help='rekomendasi dari artefak yang tersimpan')
+    query_cmd.add_argument('artifacts')
+    query_cmd.add_argument('titles', nargs='+')
+    query_cmd.add_argument('--top-n', type=int, default=10)
+    query_cmd.add_argument('--mode', default='exact', choices=['exact', 'approx', 'embedding'])
+    query_cmd.add_argument('--filters', type=json.loads, help='filter dalam format JSON')
+    query_cmd.add_argument('--diversity', type=float, default=0.0, help='bobot re-ranking MMR (0..1)')
+    query_cmd.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+
+    serve = commands.add_parser('serve', help='jalankan layanan HTTP (recommender.service)')
+    serve.add_argument('artifacts')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--cache-size', type=int, default=1024)
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        start = time.perf_counter()
+        model = build_artifacts(
+            args.csv, args.artifacts, chunksize=args.chunksize, neighbors=args.neighbors,
+            ann=args.ann, embedding=args.embedding, n_jobs=args.n_jobs,
+        )
+        print(f'{model.n_items} film disimpan ke {args.artifacts} ({time.perf_counter() - start:.1f} detik)')
+    elif args.command == 'query':
+        try:
+            results = query(args.artifacts, args.titles, args.top_n, mode=args.mode, filters=args.filters,
+                            diversity=args.diversity)
+        except (KeyError, ValueError) as e:
+            # judul tidak dikenal, mode tanpa indeks ann/embedding, atau --filters tidak valid
+            parser.exit(1, f'{e.args[0]}\n')
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False))
+        else:
+            for title, records in results.items():
+                _print_records(title, records)
+    else:
+        from .service import main as serve_main
+
+        serve_main([args.artifacts, '--host', args.host, '--port', str(args.port),
+                    '--cache-size', str(args.cache_size)])
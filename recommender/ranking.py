@@ -0,0 +1,120 @@
+"""Seleksi top-K berbasis NumPy (tanpa objek Python per elemen)."""
+import numpy as np
+
+
+def topk_rows(block, k):
+    """Ambil ``k`` kolom dengan skor tertinggi untuk setiap baris ``block``.
+
+    Menggunakan ``argpartition`` (seleksi parsial O(n)) lalu hanya
+    mengurutkan ``k`` pemenang per baris: skor menurun, indeks menaik.
+    Pemenang diambil dari ujung kanan partisi sehingga ``block`` tidak perlu
+    dinegasikan (salinan seukuran ``block``).
+
+    Returns
+    -------
+    (indices, scores) : dua array berukuran (n_baris, k)
+    """
+    block = np.asarray(block)
+    n = block.shape[1]
+    k = min(k, n)
+    if k == 0:
+        return np.empty((block.shape[0], 0), dtype=np.intp), np.empty((block.shape[0], 0), dtype=block.dtype)
+    if k < n:
+        part = np.argpartition(block, n - k, axis=1)[:, n - k:]
+    else:
+        part = np.broadcast_to(np.arange(block.shape[1]), block.shape).copy()
+    vals = np.take_along_axis(block, part, axis=1)
+    order = np.lexsort((part, -vals), axis=-1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+
+def select_top_n(scores, n, exclude=None):
+    """Pilih ``n`` indeks dengan skor tertinggi dari vektor skor 1-D.
+
+    Seleksi parsial (``np.partition``) menentukan ambang skor ke-n, lalu hanya
+    kandidat di atas ambang yang diurutkan: skor menurun, indeks menaik untuk
+    skor yang sama, sehingga hasilnya deterministik.
+
+    Parameter
+    ---------
+    scores : array 1-D
+    n : int
+    exclude : int atau array indeks, opsional
+        Indeks yang tidak boleh dikembalikan (misalnya film query itu sendiri).
+
+    Returns
+    -------
+    (indices, scores) : dua array 1-D dengan panjang maksimal ``n``
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if exclude is not None:
+        scores = scores.copy()
+        scores[exclude] = -np.inf
+        n = min(n, scores.size - np.unique(np.atleast_1d(exclude)).size)
+    n = min(n, scores.size)
+    if n <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+    if n < scores.size:
+        kth = np.partition(scores, scores.size - n)[scores.size - n]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(scores.size)
+    order = np.lexsort((candidates, -scores[candidates]))[:n]
+    top = candidates[order]
+    return top, scores[top]
+
+
+# ukuran himpunan kandidat MMR relatif terhadap top_n
+MMR_POOL_FACTOR = 5
+
+
+def mmr_rows(relevance, gram, top_n, diversity):
+    """Pilih ``top_n`` kandidat per baris dengan Maximal Marginal Relevance.
+
+    Setiap langkah memilih kandidat dengan skor
+    ``(1 - diversity) * relevansi - diversity * max(kemiripan ke yang terpilih)``
+    untuk semua baris sekaligus, sehingga hanya ada ``top_n`` langkah vektor.
+
+    Parameter
+    ---------
+    relevance : array (n_baris, m), skor relevansi kandidat
+    gram : array (n_baris, m, m), kemiripan antar kandidat pada baris yang sama
+    top_n : int
+    diversity : float antara 0 dan 1 (0 = urutan relevansi biasa)
+
+    Returns
+    -------
+    array posisi kandidat terpilih berukuran (n_baris, top_n), urut sesuai
+    pemilihan
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    n_rows, m = relevance.shape
+    top_n = min(top_n, m)
+    rows = np.arange(n_rows)
+    gain = (1 - diversity) * relevance
+    max_sim = np.full((n_rows, m), -np.inf)
+    chosen = np.empty((n_rows, top_n), dtype=np.intp)
+    for step in range(top_n):
+        # langkah pertama belum ada yang terpilih: murni relevansi
+        score = gain - diversity * max_sim if step else gain.copy()
+        if step:
+            score[rows[:, None], chosen[:, :step]] = -np.inf
+        pick = np.argmax(score, axis=1)
+        chosen[:, step] = pick
+        np.maximum(max_sim, gram[rows, pick], out=max_sim)
+    return chosen
+
+
+def mmr_rerank(engine, candidates, relevance, top_n, diversity):
+    """Susun ulang kandidat dengan MMR memakai kemiripan ``engine.gram``.
+
+    ``candidates``/``relevance`` berupa array 1-D (satu query) atau
+    (n_query, m), urut menurut relevansi. Mengembalikan ``(indices, scores)``
+    dengan bentuk yang sama tetapi hanya ``top_n`` kolom.
+    """
+    single = np.ndim(candidates) == 1
+    candidates, relevance = np.atleast_2d(candidates), np.atleast_2d(relevance)
+    pos = mmr_rows(relevance, engine.gram(candidates), top_n, diversity)
+    indices = np.take_along_axis(candidates, pos, axis=1)
+    scores = np.take_along_axis(relevance, pos, axis=1)
+    return (indices[0], scores[0]) if single else (indices, scores)
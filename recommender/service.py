@@ -0,0 +1,371 @@
+"""Layanan HTTP/JSON berbasis ``asyncio`` untuk menjawab query rekomendasi.
+
+Model dimuat satu kali saat layanan dijalankan, dan hasil rekomendasi
+disimpan dalam cache LRU berukuran terbatas yang dikunci dengan
+``(film, top_n, mode, diversity, filters)``. Respons berupa JSON berisi list dict biasa
+yang langsung dikodekan ke bytes, tanpa DataFrame pandas.
+
+Cache hit dijawab langsung di event loop; request lain (skor NumPy) dihitung
+di thread pool executor sehingga satu query mahal tidak menahan koneksi
+lain. ``TitleIndex`` dan ``FilterIndex`` dibangun saat layanan dimuat, bukan
+pada request pertama.
+
+Endpoint::
+
+    GET  /recommend?title=Avatar&top_n=10&mode=exact&diversity=0.3&filters={"genres":["Animation"]}
+    POST /recommend   {"title": "Avatar", "top_n": 10, "filters": {...}}
+    POST /profile     {"liked": [...], "weights": [...], "disliked": [...], "top_n": 10}
+    GET  /search?q=avat&limit=10
+    GET  /stats       jumlah hit/miss cache
+    GET  /health
+
+Jalankan dengan ``python -m recommender.service model_artifacts --port 8000``.
+"""
+import argparse
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+from .model import RecommenderModel
+
+try:
+    from orjson import dumps as _orjson_dumps
+except ImportError:  # pragma: no cover - orjson opsional
+    _orjson_dumps = None
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+# batas ukuran body request; body query/profil yang wajar hanya beberapa KB
+MAX_BODY_BYTES = 1 << 20
+
+
+def _json_bytes(obj):
+    if _orjson_dumps is not None:
+        return _orjson_dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """Cache LRU berukuran tetap dengan penghitung hit dan miss."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        # diakses dari event loop dan dari thread executor
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, count_miss=True):
+        """Nilai untuk ``key`` atau ``None`` (juga memperbarui penghitung)."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+
+class RecommendationService:
+    """Logika layanan di atas ``RecommenderModel`` (tanpa I/O jaringan).
+
+    Parameter
+    ---------
+    model : ``RecommenderModel``
+    cache_size : int
+        Jumlah maksimum hasil rekomendasi yang disimpan di cache LRU.
+    """
+
+    def __init__(self, model, cache_size=1024):
+        self.model = model
+        self.cache = LRUCache(cache_size)
+
+    @classmethod
+    def from_artifacts(cls, path, cache_size=1024, mmap=True):
+        service = cls(RecommenderModel.load(path, mmap=mmap), cache_size=cache_size)
+        service.warm()
+        return service
+
+    def warm(self):
+        """Bangun ``TitleIndex`` dan ``FilterIndex`` model sekarang juga.
+
+        ``FilterIndex`` (dan ``TitleIndex`` dari artefak yang belum menyimpan
+        posting trigram) dibangun secara lazy; tanpa pemanasan biayanya (detik
+        pada katalog besar) jatuh ke request pertama.
+        """
+        self.model.title_index
+        self.model.filter_index
+
+    def _recommend_key(self, idx, top_n, mode, filters, diversity):
+        return 'recommend', idx, top_n, mode, diversity, json.dumps(filters, sort_keys=True) if filters else None
+
+    def recommend(self, title, top_n=10, mode='exact', filters=None, diversity=0.0):
+        """Body JSON (bytes) rekomendasi untuk ``title``, dari cache bila ada.
+
+        Judul diubah ke indeks baris lebih dulu sehingga penulisan judul yang
+        berbeda untuk film yang sama memakai entri cache yang sama.
+        """
+        idx = self.model.index_of(title)
+        key = self._recommend_key(idx, top_n, mode, filters, diversity)
+        body = self.cache.get(key)
+        if body is None:
+            body = _json_bytes(self.model.recommend(idx, top_n, mode=mode, filters=filters, diversity=diversity))
+            self.cache.put(key, body)
+        return body
+
+    def recommend_profile(self, liked, top_n=10, weights=None, disliked=(), mode='exact', filters=None,
+                          diversity=0.0):
+        """Body JSON (bytes) rekomendasi profil (tidak di-cache)."""
+        return _json_bytes(self.model.recommend_profile(
+            liked, top_n, weights=weights, disliked=disliked, mode=mode, filters=filters, diversity=diversity,
+        ))
+
+    def search(self, query, limit=10):
+        return _json_bytes(self.model.search_titles(query, limit))
+
+    def stats(self):
+        return _json_bytes({'cache': self.cache.stats(), 'n_items': self.model.n_items})
+
+    def clear_cache(self):
+        """Kosongkan cache dan bangun ulang indeks, mis. setelah
+        ``add_movies``/``remove_movies``."""
+        self.cache.clear()
+        self.warm()
+
+    def cached(self, method, target, body=b''):
+        """``(status, body)`` yang bisa dijawab tanpa menghitung skor, atau ``None``.
+
+        Dipakai event loop untuk menjawab cache hit, ``/health``, dan
+        ``/stats`` secara langsung; sisanya diteruskan ke ``handle`` di
+        executor.
+        """
+        try:
+            path, params = _parse_request(method, target, body)
+            if path in ('/health', '/stats'):
+                return 200, self._route(path, params)
+            if path != '/recommend':
+                return None
+            title, top_n, mode, filters, diversity = _recommend_args(params)
+            key = self._recommend_key(self.model.index_of(title), top_n, mode, filters, diversity)
+        except Exception:  # noqa: BLE001 - kesalahan dilaporkan oleh ``handle``
+            return None
+        body = self.cache.get(key, count_miss=False)
+        return None if body is None else (200, body)
+
+    def handle(self, method, target, body=b''):
+        """Proses satu request dan kembalikan ``(status, body_json_bytes)``."""
+        try:
+            return 200, self._route(*_parse_request(method, target, body))
+        except HTTPError as e:
+            return e.status, _json_bytes({'error': str(e)})
+        except KeyError as e:
+            return 404, _json_bytes({'error': e.args[0] if e.args else str(e)})
+        except (TypeError, ValueError) as e:
+            return 400, _json_bytes({'error': str(e)})
+        except Exception as e:  # noqa: BLE001 - satu request gagal tidak boleh menjatuhkan server
+            return 500, _json_bytes({'error': repr(e)})
+
+    def _route(self, path, params):
+        if path == '/recommend':
+            title, top_n, mode, filters, diversity = _recommend_args(params)
+            return self.recommend(title, top_n, mode=mode, filters=filters, diversity=diversity)
+        if path == '/profile':
+            return self.recommend_profile(
+                _typed(_required(params, 'liked'), 'liked', list), int(params.get('top_n', 10)),
+                weights=_typed(params.get('weights'), 'weights', list),
+                disliked=_typed(params.get('disliked', []), 'disliked', list),
+                mode=params.get('mode', 'exact'), filters=_filters(params),
+                diversity=float(params.get('diversity', 0)),
+            )
+        if path == '/search':
+            return self.search(_required(params, 'q'), int(params.get('limit', 10)))
+        if path == '/stats':
+            return self.stats()
+        if path == '/health':
+            return _json_bytes({'status': 'ok'})
+        raise HTTPError(404, f'path tidak dikenal: {path}')
+
+
+def _parse_request(method, target, body):
+    """``(path, params)``: query string digabung dengan body JSON (POST)."""
+    url = urlsplit(target)
+    params = dict(parse_qsl(url.query))
+    if method == 'POST':
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, 'body bukan JSON yang valid') from None
+        if not isinstance(payload, dict):
+            raise HTTPError(400, 'body harus berupa objek JSON')
+        params.update(payload)
+    elif method != 'GET':
+        raise HTTPError(405, f'method {method} tidak didukung')
+    return url.path, params
+
+
+def _recommend_args(params):
+    return (
+        _required(params, 'title'), int(params.get('top_n', 10)), params.get('mode', 'exact'),
+        _filters(params), float(params.get('diversity', 0)),
+    )
+
+
+def _required(params, name):
+    if name not in params:
+        raise HTTPError(400, f'parameter {name!r} wajib diisi')
+    return params[name]
+
+
+def _typed(value, name, kind):
+    # mis. string untuk ``liked`` akan diiterasi per karakter oleh model
+    if value is not None and not isinstance(value, kind):
+        raise HTTPError(400, f"parameter {name!r} harus berupa {'array' if kind is list else 'objek'} JSON")
+    return value
+
+
+def _filters(params):
+    """``filters`` dari body JSON atau query string (berupa string JSON)."""
+    filters = params.get('filters')
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    return _typed(filters, 'filters', dict)
+
+
+async def _handle_connection(service, reader, writer):
+    """Layani request HTTP/1.1 (keep-alive) pada satu koneksi."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, version = request_line.decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            if not 0 <= length <= MAX_BODY_BYTES:
+                # body tidak dibaca, jadi koneksi tidak bisa dipakai ulang
+                status, keep_alive = 413, False
+                payload = _json_bytes({'error': f'body maksimal {MAX_BODY_BYTES} byte'})
+            else:
+                body = await reader.readexactly(length) if length else b''
+                response = service.cached(method, target, body)
+                if response is None:
+                    response = await asyncio.get_running_loop().run_in_executor(
+                        None, service.handle, method, target, body,
+                    )
+                status, payload = response
+            writer.write(
+                f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\n'
+                f'Content-Type: application/json\r\n'
+                f'Content-Length: {len(payload)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + payload
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+        # CancelledError: koneksi dihentikan saat server dimatikan
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host='127.0.0.1', port=8000):
+    """Mulai server ``asyncio`` dan kembalikan objek ``asyncio.Server``."""
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port,
+    )
+
+
+class ServiceThread:
+    """Jalankan layanan di thread latar (untuk notebook dan pengujian lokal).
+
+    ``port=0`` memilih port bebas; port yang dipakai tersedia di ``.port``.
+    """
+
+    def __init__(self, service, host='127.0.0.1', port=0):
+        self.service = service
+        self.host = host
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(start_server(service, host, port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+
+    def stop(self):
+        async def shutdown():
+            self._server.close()
+            # koneksi keep-alive yang masih terbuka dihentikan
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Layanan HTTP rekomendasi film')
+    parser.add_argument('artifacts', help='direktori artefak hasil RecommenderModel.save')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-size', type=int, default=1024)
+    args = parser.parse_args(argv)
+    service = RecommendationService.from_artifacts(args.artifacts, cache_size=args.cache_size)
+
+    async def run():
+        server = await start_server(service, args.host, args.port)
+        print(f'Melayani {service.model.n_items} film di http://{args.host}:{args.port}')
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Cosine similarity on-demand di atas matriks fitur sparse.
+
+Alih-alih membentuk matriks ``cos_sim`` berukuran n x n, setiap baris
+``feature_mat`` dinormalisasi L2 sekali di awal sehingga cosine similarity
+cukup dihitung sebagai dot product satu baris query terhadap seluruh katalog.
+Memori yang dibutuhkan sebanding dengan jumlah elemen non-zero, bukan n^2.
+"""
+import numpy as np
+from scipy import sparse
+
+from .ranking import topk_rows
+
+# kolom dengan proporsi non-zero di atas ambang ini (misalnya genre dan
+# popularity) diproses sebagai matriks dense kecil pada skor batch
+DENSE_COLUMN_DENSITY = 0.05
+
+
+def normalize_rows(mat, dtype=np.float64):
+    """Kembalikan salinan CSR dari ``mat`` dengan norma L2 setiap baris = 1.
+
+    Baris yang seluruhnya nol dibiarkan nol (similarity-nya selalu 0).
+    """
+    mat = sparse.csr_matrix(mat, dtype=dtype, copy=True)
+    mat.sum_duplicates()
+    row_nnz = np.diff(mat.indptr)
+    rows = np.repeat(np.arange(mat.shape[0]), row_nnz)
+    norms = np.sqrt(np.bincount(rows, weights=mat.data ** 2, minlength=mat.shape[0]))
+    norms[norms == 0] = 1.0
+    mat.data /= np.repeat(norms, row_nnz).astype(dtype, copy=False)
+    return mat
+
+
+def _unit_profile(query):
+    """Normalisasi L2 vektor profil; profil bernorma 0 ditolak."""
+    norm = np.linalg.norm(query)
+    if not norm > 0:
+        raise ValueError('profil kosong: bobot film yang disukai dan tidak disukai saling meniadakan')
+    return query / norm
+
+
+class SimilarityEngine:
+    """Menghitung skor cosine similarity satu film terhadap seluruh katalog.
+
+    Parameter
+    ---------
+    feature_mat : matriks sparse/dense (n_film x n_fitur)
+        Matriks fitur hasil ``hstack`` pada tahap feature engineering.
+    assume_normalized : bool
+        Pakai ``feature_mat`` apa adanya jika barisnya sudah ber-norma L2.
+    """
+
+    def __init__(self, feature_mat, assume_normalized=False):
+        if assume_normalized:
+            self.feature_mat = sparse.csr_matrix(feature_mat)
+        else:
+            self.feature_mat = normalize_rows(feature_mat)
+        self._column_split = None
+
+    @property
+    def n_items(self):
+        return self.feature_mat.shape[0]
+
+    def append_rows(self, rows):
+        """Tambahkan baris fitur baru (belum dinormalisasi) di akhir katalog."""
+        rows = normalize_rows(rows, dtype=self.feature_mat.dtype)
+        self.feature_mat = sparse.vstack([self.feature_mat, rows], format='csr')
+        self._column_split = None
+
+    def select_rows(self, keep):
+        """Pertahankan hanya baris dengan ``keep`` bernilai ``True``."""
+        self.feature_mat = self.feature_mat[np.asarray(keep, dtype=bool)]
+        self._column_split = None
+
+    def query_vector(self, idx):
+        """Baris ``idx`` dari matriks ternormalisasi sebagai vektor dense."""
+        return self.feature_mat[idx].toarray().ravel()
+
+    def scores(self, idx):
+        """Skor cosine film ``idx`` terhadap semua film (array 1-D panjang n).
+
+        Dihitung dengan satu perkalian sparse matrix-vector, sehingga tidak
+        pernah mengalokasikan baris-baris lain dari matriks n x n.
+        """
+        return self.query_scores(self.query_vector(idx))
+
+    def query_scores(self, query, candidates=None):
+        """Skor vektor query ber-norma L2 terhadap semua film atau ``candidates``.
+
+        Dengan ``candidates`` hanya baris kandidat yang dikalikan, sehingga
+        biaya sebanding dengan ukuran himpunan kandidat, bukan ukuran katalog.
+        """
+        if candidates is None:
+            return self.feature_mat @ query
+        return self.feature_mat[candidates] @ query
+
+    def profile_vector(self, idx, weights):
+        """Vektor query gabungan: jumlah berbobot baris ``idx``, ber-norma L2.
+
+        Bobot negatif dipakai untuk film yang tidak disukai. Biayanya hanya
+        sebanding dengan jumlah non-zero baris ``idx``.
+
+        Raises
+        ------
+        ValueError : jika vektor gabungan nol (mis. semua bobot 0, atau film
+            yang sama disukai dan tidak disukai), karena skornya tidak berarti
+        """
+        query = self.feature_mat[idx].T @ np.asarray(weights, dtype=np.float64)
+        return _unit_profile(query)
+
+    def _split_columns(self, transpose=True):
+        """Pisahkan kolom padat dan kolom jarang dari ``feature_mat`` (di-cache).
+
+        Kolom padat hampir selalu terisi sehingga perkalian sparse-nya mahal;
+        kolom ini disimpan dense (n x beberapa kolom) dan dikalikan dengan BLAS,
+        sedangkan sisanya tetap CSR. Transpos bagian CSR (elemen ketiga, salinan
+        seukuran katalog) hanya dibangun bila ``transpose=True``.
+        """
+        if self._column_split is None:
+            X = self.feature_mat
+            density = np.bincount(X.indices, minlength=X.shape[1]) / max(X.shape[0], 1)
+            dense_cols = density > DENSE_COLUMN_DENSITY
+            self._column_split = (X[:, dense_cols].toarray(), X[:, ~dense_cols].tocsr(), None)
+        if transpose and self._column_split[2] is None:
+            dense, sparse_part, _ = self._column_split
+            self._column_split = (dense, sparse_part, sparse_part.T.tocsr())
+        return self._column_split
+
+    def batch_scores(self, idx):
+        """Skor cosine beberapa film sekaligus (array ``len(idx) x n``).
+
+        Satu perkalian matriks-matriks menggantikan ``len(idx)`` perkalian
+        matrix-vector terpisah. Bagian sparse ditambahkan langsung ke hasil
+        bagian dense agar tidak ada salinan ketiga seukuran blok.
+        """
+        dense, sparse_part, sparse_part_t = self._split_columns()
+        block = dense[idx] @ dense.T
+        block += (sparse_part[idx] @ sparse_part_t).toarray()
+        return block
+
+    def top_n_batch(self, idx, top_n, chunk_size=256):
+        """Top-N film termirip untuk setiap film di ``idx``.
+
+        Film query diproses per potongan ``chunk_size`` baris sehingga memori
+        puncak kira-kira ``n * chunk_size`` float. Film query sendiri selalu
+        dikecualikan dari hasilnya.
+
+        Returns
+        -------
+        (indices, scores) : dua array berukuran (len(idx), top_n)
+        """
+        idx = np.asarray(idx, dtype=np.intp).ravel()
+        top_n = min(top_n, self.n_items - 1)
+        indices = np.empty((idx.size, top_n), dtype=np.int32)
+        scores = np.empty((idx.size, top_n), dtype=np.float64)
+        for start in range(0, idx.size, chunk_size):
+            chunk = idx[start:start + chunk_size]
+            block = self.batch_scores(chunk)
+            block[np.arange(chunk.size), chunk] = -np.inf
+            indices[start:start + chunk.size], scores[start:start + chunk.size] = topk_rows(block, top_n)
+        return indices, scores
+
+    def gram(self, idx, chunk_size=64):
+        """Kemiripan antar film dalam setiap baris ``idx`` (array ``b x m``).
+
+        Mengembalikan array ``b x m x m``. Untuk satu baris (query tunggal)
+        cukup ``X[c] @ X[c].T`` langsung dari ``feature_mat``, tanpa menyalin
+        matriks apa pun. Untuk banyak baris kolom padat dikalikan dengan BLAS,
+        sedangkan kolom jarang setiap baris ``idx`` digeser ke rentang kolomnya
+        sendiri, sehingga satu perkalian sparse hanya menghitung pasangan di
+        dalam baris yang sama (hasilnya blok-diagonal).
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        n_rows, m = idx.shape
+        if n_rows == 1:
+            rows = self.feature_mat[idx[0]]
+            return (rows @ rows.T).toarray()[None]
+        dense, sparse_part, _ = self._split_columns(transpose=False)
+        n_cols = sparse_part.shape[1]
+        out = np.empty((n_rows, m, m), dtype=np.result_type(self.feature_mat.dtype, np.float32))
+        for start in range(0, n_rows, chunk_size):
+            chunk = idx[start:start + chunk_size]
+            rows = chunk.ravel()
+            part = dense[rows].reshape(chunk.shape[0], m, -1)
+            block = np.matmul(part, part.transpose(0, 2, 1))
+            part = sparse_part[rows]
+            shift = np.repeat(np.arange(chunk.shape[0], dtype=np.int64) * n_cols, m)
+            shifted = sparse.csr_matrix(
+                (part.data, part.indices + np.repeat(shift, np.diff(part.indptr)), part.indptr),
+                shape=(rows.size, chunk.shape[0] * n_cols),
+            )
+            prod = (shifted @ shifted.T).tocoo()
+            block[prod.row // m, prod.row % m, prod.col % m] += prod.data
+            out[start:start + chunk.shape[0]] = block
+        return out
@@ -0,0 +1,245 @@
+"""Indeks judul film: lookup eksak, prefix (autocomplete), dan fuzzy.
+
+Judul dinormalisasi (huruf kecil, aksen dan tanda baca dibuang, spasi
+dirapikan) sehingga ``"Amélie"`` dan ``"amelie"`` menunjuk film yang sama.
+Judul yang dipakai beberapa film dipetakan ke semua barisnya, dan dapat
+dibedakan dengan kunci bertahun seperti ``"Avatar (2009)"``.
+
+- lookup eksak: satu akses dict;
+- prefix: pencarian biner atas daftar judul ternormalisasi yang terurut;
+- fuzzy: inverted index trigram karakter, kandidat diberi skor Dice.
+  Trigram yang sangat umum (mis. ``" th"``) tidak dipakai untuk membangkitkan
+  kandidat, hanya ikut dihitung pada kandidat dari trigram yang lebih jarang
+  lewat matriks bit. Paling banyak ``MAX_CANDIDATES`` kandidat dengan batas
+  atas skor tertinggi yang diberi skor penuh.
+
+Inverted index (kunci terurut dan posting per kode trigram) bisa disimpan
+bersama artefak model lewat ``arrays()`` sehingga tidak dibangun ulang di
+setiap worker.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+from scipy import sparse
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+_YEAR_SUFFIX = re.compile(r'^(.*\S)\s+(\d{4})$')
+
+# byte ASCII -> digit basis 37 untuk kode trigram: spasi 0, angka 1-10, huruf 11-36
+_BASE = 37
+N_TRIGRAMS = _BASE ** 3
+_ALPHABET = np.zeros(128, dtype=np.int64)
+_ALPHABET[np.frombuffer(b'0123456789abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = np.arange(1, _BASE)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# jumlah trigram umum yang membangkitkan kandidat fuzzy bila query tidak
+# memiliki trigram jarang; satu salah ketik mengubah paling banyak tiga trigram
+FALLBACK_SEEDS = 4
+# batas kandidat fuzzy yang diberi skor penuh, dipilih menurut batas atas
+# skor Dice; menjaga latensi tetap rendah pada katalog besar
+MAX_CANDIDATES = 4096
+
+
+def normalize_title(title):
+    """``'Amélie (2001)!'`` -> ``'amelie 2001'``."""
+    title = str(title)
+    if not title.isascii():
+        title = unicodedata.normalize('NFKD', title)
+        title = ''.join(c for c in title if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', title.casefold()).strip()
+
+
+def _popcount_rows(words):
+    """Jumlah bit 1 per baris matriks ``uint64``."""
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    octets = np.ascontiguousarray(words).view(np.uint8)
+    return _POPCOUNT[octets].reshape(len(words), -1).sum(axis=1, dtype=np.int32)
+
+
+def _trigram_codes(keys):
+    """Kode trigram setiap kunci ternormalisasi: ``(nomor kunci, kode)``.
+
+    Kunci hanya berisi ``[0-9a-z ]`` sehingga setiap trigram dari kunci yang
+    diberi padding ``'  kunci '`` bisa dikodekan sebagai bilangan basis 37
+    dan semua kunci diproses sekaligus dengan numpy.
+    """
+    padded = [f'  {key} ' for key in keys]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    chars = _ALPHABET[np.frombuffer(''.join(padded).encode('ascii'), dtype=np.uint8)]
+    key_ids = np.repeat(np.arange(len(padded)), lengths - 2)
+    # trigram ke-i secara global dimulai di karakter i + 2 * nomor kuncinya
+    pos = np.arange(key_ids.size) + 2 * key_ids
+    return key_ids, (chars[pos] * _BASE + chars[pos + 1]) * _BASE + chars[pos + 2]
+
+
+class TitleIndex:
+    """Pemetaan judul ternormalisasi (dan judul + tahun) ke indeks baris.
+
+    Parameter
+    ---------
+    titles : list judul film, urut sesuai baris katalog
+    years : array tahun rilis per film (``NaN`` jika tidak diketahui), opsional
+    keys, key_ids, postings : hasil ``arrays()`` dari indeks yang sama, opsional
+        Jika diberikan (dari artefak), normalisasi judul dan inverted index
+        trigram tidak dihitung ulang.
+    """
+
+    def __init__(self, titles, years=None, keys=None, key_ids=None, postings=None):
+        self.titles = list(titles)
+        years = np.full(len(self.titles), np.nan) if years is None else np.asarray(years, dtype=np.float64)
+        if keys is None:
+            # judul asli -> kunci ternormalisasi, jalur cepat untuk judul yang ditulis persis
+            self._raw_key = {}
+            for title in self.titles:
+                if title not in self._raw_key:
+                    self._raw_key[title] = normalize_title(title)
+            keys = sorted(set(self._raw_key.values()))
+            number = {key: k for k, key in enumerate(keys)}
+            key_ids = np.array([number[self._raw_key[title]] for title in self.titles], dtype=np.int32)
+        else:
+            key_ids = np.asarray(key_ids)
+            self._raw_key = {title: keys[k] for title, k in zip(self.titles, key_ids.tolist())}
+        self._keys, self._key_ids = list(keys), key_ids
+        self._by_key, self._by_year = {}, {}
+        for i, (k, year) in enumerate(zip(key_ids.tolist(), years.tolist())):
+            key = self._keys[k]
+            self._by_key.setdefault(key, []).append(i)
+            if not math.isnan(year):
+                self._by_year.setdefault((key, int(year)), []).append(i)
+        if postings is None:
+            # inverted index trigram -> nomor kunci, satu baris CSR per kode trigram
+            key_of, codes = _trigram_codes(self._keys)
+            pairs = np.sort(codes * len(self._keys) + key_of)
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+            codes, key_of = np.divmod(pairs, len(self._keys))
+            indptr = np.zeros(N_TRIGRAMS + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=N_TRIGRAMS), out=indptr[1:])
+            postings = sparse.csr_matrix(
+                (np.ones(key_of.size, dtype=np.int8), key_of.astype(np.int32), indptr),
+                shape=(N_TRIGRAMS, len(self._keys)),
+            )
+        self._postings = postings
+        self._n_grams = np.bincount(postings.indices, minlength=len(self._keys)).astype(np.int32)
+        # trigram yang sangat umum tidak ikut membangkitkan kandidat; keanggotaannya
+        # disimpan sebagai matriks bit (kunci x trigram umum) untuk menghitung skor
+        indptr = postings.indptr
+        self._sizes = np.diff(indptr)
+        common = np.flatnonzero(self._sizes > max(256, len(self._keys) // 50)).tolist()
+        self._common = {code: j for j, code in enumerate(common)}
+        self._common_bits = np.zeros((len(self._keys), (len(common) + 63) // 64), dtype=np.uint64)
+        for j, code in enumerate(common):
+            self._common_bits[postings.indices[indptr[code]:indptr[code + 1]], j >> 6] |= np.uint64(1 << (j & 63))
+        self.years = years
+
+    def arrays(self):
+        """``keys``, ``key_ids``, dan ``postings`` untuk disimpan ke artefak."""
+        return {'keys': self._keys, 'key_ids': self._key_ids, 'postings': self._postings}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def lookup(self, title):
+        """Semua indeks baris untuk ``title`` (boleh berakhiran tahun)."""
+        key = normalize_title(title)
+        if key in self._by_key:
+            return list(self._by_key[key])
+        match = _YEAR_SUFFIX.match(key)
+        if match is not None:
+            return list(self._by_year.get((match.group(1), int(match.group(2))), []))
+        return []
+
+    def resolve(self, title):
+        """Satu indeks baris untuk ``title``.
+
+        Jika beberapa film memakai judul yang sama dipilih baris pertama;
+        gunakan kunci bertahun (``"Judul (2009)"``) untuk memilih film lain.
+
+        Raises
+        ------
+        KeyError : jika judul tidak ditemukan, berisi saran judul terdekat
+        """
+        key = self._raw_key.get(title)
+        if key is not None:
+            return self._by_key[key][0]
+        ids = self.lookup(title)
+        if not ids:
+            suggestions = [self.label(i) for i, _ in self.fuzzy(title, limit=3)]
+            raise KeyError(f'judul tidak ditemukan: {title!r}, mungkin maksud Anda: {suggestions}')
+        return ids[0]
+
+    def label(self, idx):
+        """Judul film ``idx`` beserta tahunnya, misalnya ``'Avatar (2009)'``."""
+        year = self.years[idx]
+        return self.titles[idx] if np.isnan(year) else f'{self.titles[idx]} ({int(year)})'
+
+    def prefix(self, query, limit=10):
+        """Indeks baris film yang judulnya diawali ``query``, urut alfabetis."""
+        query = normalize_title(query)
+        result = []
+        for k in range(bisect_left(self._keys, query), len(self._keys)):
+            key = self._keys[k]
+            if not key.startswith(query) or len(result) >= limit:
+                break
+            result.extend(self._by_key[key][:limit - len(result)])
+        return result
+
+    def fuzzy(self, query, limit=10, min_score=0.3):
+        """Film dengan judul termirip ``query`` sebagai list ``(idx, skor)``.
+
+        Skor adalah koefisien Dice trigram karakter (1.0 = identik setelah
+        normalisasi), sehingga salah ketik kecil tetap ditemukan.
+        """
+        grams = sorted(set(_trigram_codes([normalize_title(query)])[1].tolist()))
+        seeds = [g for g in grams if g not in self._common and self._sizes[g]]
+        common = sorted((g for g in grams if g in self._common), key=self._sizes.__getitem__)
+        if not seeds:
+            # tanpa trigram jarang, kandidat dibangkitkan dari beberapa trigram
+            # umum yang paling jarang (cukup untuk satu salah ketik)
+            seeds, common = common[:FALLBACK_SEEDS], common[FALLBACK_SEEDS:]
+        if not seeds:
+            return []
+        indptr, indices = self._postings.indptr, self._postings.indices
+        ids = np.sort(np.concatenate([indices[indptr[g]:indptr[g + 1]] for g in seeds]))
+        starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+        cand, shared = ids[starts], np.diff(np.append(starts, ids.size))
+        # Dice >= min_score butuh minimal ``need`` trigram bersama; kandidat
+        # yang tidak mungkin mencapainya dibuang sebelum trigram umum dihitung
+        need = math.ceil(min_score * len(grams) / (2.0 - min_score) - 1e-9)
+        keep = shared >= need - len(common)
+        cand, shared = cand[keep], shared[keep]
+        if cand.size > MAX_CANDIDATES:
+            # pra-peringkat dengan batas atas skor Dice: trigram benih bersama
+            # ditambah semua trigram umum yang mungkin masih cocok
+            n_grams = self._n_grams[cand]
+            bound = (shared + np.minimum(len(common), n_grams - shared)) / (len(grams) + n_grams)
+            top = np.argpartition(-bound, MAX_CANDIDATES)[:MAX_CANDIDATES]
+            cand, shared = cand[top], shared[top]
+        if common:
+            columns = np.array([self._common[g] for g in common], dtype=np.uint64)
+            query_bits = np.zeros(self._common_bits.shape[1], dtype=np.uint64)
+            np.bitwise_or.at(query_bits, columns >> np.uint64(6), np.uint64(1) << (columns & np.uint64(63)))
+            words = np.flatnonzero(query_bits)
+            shared = shared + _popcount_rows(np.take(self._common_bits, cand, axis=0)[:, words] & query_bits[words])
+        scores = 2.0 * shared / (len(grams) + self._n_grams[cand])
+        keep = scores >= min_score
+        if keep.sum() > limit:
+            # skor ke-``limit`` sebagai ambang; film dengan skor sama tetap ikut
+            keep &= scores >= -np.partition(-scores, limit - 1)[limit - 1]
+        cand, scores = cand[keep], scores[keep]
+        order = np.lexsort((cand, -scores))[:limit]
+        result = []
+        for k, score in zip(cand[order], scores[order]):
+            result.extend((i, float(score)) for i in self._by_key[self._keys[k]])
+        return result[:limit]
+
+    def complete(self, query, limit=10):
+        """Saran untuk kotak pencarian: hasil prefix, dilengkapi hasil fuzzy."""
+        result = self.prefix(query, limit)
+        if len(result) < limit:
+            seen = set(result)
+            result.extend(i for i, _ in self.fuzzy(query, limit) if i not in seen)
+        return result[:limit]